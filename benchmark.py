@@ -0,0 +1,241 @@
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import tracemalloc
+import numpy as np
+import shapely
+from src.geometry import create_polys_from_state, layout_side
+from src.optimizer import objective_function, depth_objective_function, IncrementalCost, gradient_squeeze
+from src.env import ChristmasTreeEnv
+from src.seeding import lattice_layout, seed_state
+from src.scoring import score_puzzles
+from src.annealing import anneal
+
+DEFAULT_SIZES = (10, 50, 100, 200)
+
+# Skala noise / gerakan kecil (x, y, deg): seperti rollout RL di sekitar seed
+LAYOUT_NOISE = (0.02, 0.02, 2.0)
+MOVE_NOISE = (0.01, 0.01, 1.0)
+
+def make_layout(n, seed=0):
+    """Layout uji yang realistis: lattice rapat + sedikit noise (ada beberapa overlap)."""
+    rng = np.random.default_rng(seed)
+    state = lattice_layout(n).reshape(n, 3)
+    state += rng.normal(0, LAYOUT_NOISE, size=state.shape)
+    return state.ravel()
+
+def _env_step(n, reward_mode):
+    env = ChristmasTreeEnv(n_trees=n, reward_mode=reward_mode, initial_state=make_layout(n))
+    env.reset()
+    action = np.random.default_rng(0).uniform(-1, 1, n * 3).astype(np.float32) * 0.01
+    return lambda: env.step(action)
+
+def _incremental_move(n):
+    # Gerakan kecil tiap pohon di sekitar posisinya di layout awal (seperti annealing)
+    inc = IncrementalCost(make_layout(n), n)
+    rng = np.random.default_rng(0)
+    trees = rng.integers(n, size=256)
+    moves = inc.state[trees] + rng.normal(0, MOVE_NOISE, (256, 3))
+    counter = [0]
+    def run():
+        k = counter[0] = (counter[0] + 1) % 256
+        inc.move(trees[k], *moves[k])
+    return run
+
+def _solve(n, maxiter=100):
+    """
+    Throughput end-to-end satu puzzle: seed -> squeeze -> validasi ketat.
+    Titik awal = seed + noise kecil (seperti hasil rollout); squeeze dengan
+    jumlah iterasi tetap (bukan anggaran waktu) agar hasilnya bisa dibandingkan.
+    """
+    noise = np.random.default_rng(0).normal(0, MOVE_NOISE, size=(n, 3)).ravel()
+    def run():
+        start = seed_state(n) + noise
+        _, coords = gradient_squeeze(start, n, anneal=False, maxiter=maxiter)
+        report = score_puzzles({n: coords.reshape(n, 3)})
+        assert report[n]["valid"], f"solve N={n} menghasilkan layout tidak valid"
+    return run
+
+def _anneal(n, moves=2000):
+    state = lattice_layout(n)
+    return lambda: anneal(state, n, n_steps=moves, rng=0, verbose=False)
+
+# Nama kasus -> (setup(n) -> callable tanpa argumen, jumlah operasi per panggilan, satuan)
+CASES = {
+    "create_polys": (lambda n: (lambda s=make_layout(n): create_polys_from_state(s, n)), 1, "layout/s"),
+    "layout_side": (lambda n: (lambda s=make_layout(n): layout_side(s)), 1, "layout/s"),
+    "objective": (lambda n: (lambda s=make_layout(n): objective_function(s, n, None)), 1, "eval/s"),
+    "depth_objective": (lambda n: (lambda s=make_layout(n): depth_objective_function(s, n)), 1, "eval/s"),
+    "incremental_move": (_incremental_move, 1, "move/s"),
+    "env_step": (lambda n: _env_step(n, "exact"), 1, "step/s"),
+    "env_step_fast": (lambda n: _env_step(n, "fast"), 1, "step/s"),
+    "score_strict": (lambda n: (lambda p={n: make_layout(n).reshape(n, 3)}: score_puzzles(p)), 1, "puzzle/s"),
+    "anneal": (_anneal, 2000, "move/s"),
+    "solve": (_solve, 1, "puzzle/s"),
+}
+
+# Modul entry point yang diukur waktu import-nya, dan dependensi berat yang
+# seharusnya TIDAK ikut ter-load oleh jalur scoring / validasi / resume
+STARTUP_MODULES = ("score", "submit", "train", "train_with_cuda", "src.scoring", "src.store")
+HEAVY_MODULES = ("torch", "stable_baselines3", "gymnasium", "tqdm", "scipy", "pandas", "shapely")
+
+_STARTUP_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"import_s": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure_startup(module, repeat=3):
+    """
+    Waktu startup entry point di interpreter baru (tanpa cache import di memori):
+    wall time proses dan waktu import modul itu sendiri, diambil yang terbaik.
+    Return: (wall_s, import_s, daftar modul berat yang ikut ter-load).
+    """
+    code = _STARTUP_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+    best_wall, best_import, heavy = np.inf, np.inf, []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        best_wall = min(best_wall, time.perf_counter() - start)
+        info = json.loads(out.stdout.strip().splitlines()[-1])
+        best_import, heavy = min(best_import, info["import_s"]), info["heavy"]
+    return best_wall, best_import, heavy
+
+def run_startup(modules, repeat=3):
+    results = {}
+    for module in modules:
+        wall, imp, heavy = measure_startup(module, repeat)
+        key = f"startup/{module}"
+        results[key] = {
+            "case": "startup",
+            "module": module,
+            "per_call_s": wall,
+            "import_s": imp,
+            "heavy": heavy,
+        }
+        print(f"{key:28s} {wall * 1e3:10.1f} ms  (import {imp * 1e3:8.1f} ms)  "
+              f"berat: {', '.join(heavy) or '-'}")
+    return results
+
+def measure(fn, min_time=0.2, repeat=3):
+    """
+    Waktu per panggilan (detik): jumlah loop dikalibrasi seperti timeit.autorange
+    sampai >= min_time, lalu diambil yang terbaik dari `repeat` pengulangan.
+    """
+    fn()  # warm-up (cache, import lazy, alokasi pertama)
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+def peak_memory(fn):
+    """Puncak alokasi heap Python/NumPy (byte) untuk satu panggilan (tracemalloc)."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_benchmarks(names, sizes, min_time=0.2, repeat=3):
+    results = {}
+    for name in names:
+        setup, ops_per_call, unit = CASES[name]
+        for n in sizes:
+            fn = setup(n)
+            per_call = measure(fn, min_time, repeat)
+            key = f"{name}/N={n}"
+            results[key] = {
+                "case": name,
+                "n": n,
+                "per_call_s": per_call,
+                "ops_per_s": ops_per_call / per_call,
+                "unit": unit,
+                "peak_kb": peak_memory(fn) / 1024,
+            }
+            print(f"{key:28s} {per_call * 1e3:10.3f} ms  {ops_per_call / per_call:14,.1f} {unit:9s} "
+                  f"peak {results[key]['peak_kb']:10.1f} KB")
+    return results
+
+def compare(results, baseline, threshold):
+    """
+    Bandingkan dengan baseline: rasio waktu per panggilan (baru / lama).
+    Return list kasus yang melambat lebih dari threshold (mis. 0.2 = 20%).
+    """
+    regressions = []
+    print(f"\n{'Kasus':28s} {'baseline ms':>12s} {'baru ms':>12s} {'rasio':>8s}")
+    for key, res in results.items():
+        old = baseline.get("results", {}).get(key)
+        if old is None:
+            continue
+        ratio = res["per_call_s"] / old["per_call_s"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  <-- REGRESI"
+            regressions.append(key)
+        print(f"{key:28s} {old['per_call_s'] * 1e3:12.3f} {res['per_call_s'] * 1e3:12.3f} {ratio:8.2f}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hot path geometri, cost, env step dan solver.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Ukuran puzzle N")
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="Hanya jalankan kasus ini")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Durasi minimum per pengukuran (detik)")
+    parser.add_argument("--repeat", type=int, default=3, help="Jumlah pengulangan (diambil yang terbaik)")
+    parser.add_argument("--save", help="Simpan hasil sebagai JSON (mis. baseline baru)")
+    parser.add_argument("--baseline", help="JSON baseline untuk dibandingkan")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Batas regresi relatif (0.2 = 20%% lebih lambat)")
+    parser.add_argument("--startup", nargs="*", metavar="MODULE",
+                        help="Ukur waktu startup (import di proses baru) saja; default semua entry point")
+    args = parser.parse_args()
+
+    if args.startup is not None:
+        results = run_startup(args.startup or list(STARTUP_MODULES), args.repeat)
+    else:
+        results = run_benchmarks(args.only or list(CASES), args.sizes, args.min_time, args.repeat)
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "shapely": shapely.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nHasil disimpan ke {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} kasus melambat > {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print("\nTidak ada regresi.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
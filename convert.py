@@ -0,0 +1,30 @@
+import sys
+import time
+import argparse
+from src.archive import load_puzzles, write_archive, export_csv
+from src.store import SolutionStore
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Konversi layout antara CSV submission dan arsip biner (memmap), lossless."
+    )
+    parser.add_argument("source", help="CSV submission, arsip .bin, atau 'store' (solution store SQLite)")
+    parser.add_argument("target", help="Path tujuan: .csv untuk ekspor CSV, selain itu arsip biner")
+    parser.add_argument("--decimals", type=int, help="Bulatkan CSV ke sekian desimal (default: lossless)")
+    args = parser.parse_args()
+
+    start = time.time()
+    if args.source == "store":
+        puzzles = {sol["n"]: sol["state"] for sol in SolutionStore().all()}
+    else:
+        puzzles = load_puzzles(args.source)
+
+    if args.target.endswith(".csv"):
+        export_csv(args.target, puzzles, decimals=args.decimals)
+    else:
+        write_archive(args.target, puzzles)
+    print(f"{len(puzzles)} puzzle: {args.source} -> {args.target} ({time.time() - start:.3f} detik)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import sys
+import json
+import time
+import argparse
+from src.scoring import score_puzzles, total_score, diff_reports
+from src.archive import load_puzzles
+
+def main():
+    parser = argparse.ArgumentParser(description="Hitung skor kompetisi dan validasi ketat sebuah submission CSV.")
+    parser.add_argument("submission", help="Path CSV submission (id,x,y,deg dengan prefix 's') atau arsip biner .bin")
+    parser.add_argument("--baseline", help="CSV/arsip baseline untuk dibandingkan (mis. data/raw/sample_submission.csv)")
+    parser.add_argument("--json", dest="json_path", help="Tulis laporan/diff JSON ke file ini ('-' untuk stdout)")
+    args = parser.parse_args()
+
+    start = time.time()
+    report = score_puzzles(load_puzzles(args.submission))
+    total = total_score(report)
+
+    invalid = [n for n, p in report.items() if not p["valid"]]
+    for n in invalid:
+        p = report[n]
+        if p["out_of_bounds"]:
+            print(f"Puzzle {n:03d}: koordinat di luar batas", file=sys.stderr)
+        for i, j in p["overlaps"]:
+            print(f"Puzzle {n:03d}: pohon {i} dan {j} overlap", file=sys.stderr)
+
+    if args.baseline:
+        result = diff_reports(report, score_puzzles(load_puzzles(args.baseline)))
+    else:
+        result = {"total": total, "puzzles": list(report.values())}
+    result["valid"] = not invalid
+    result["invalid"] = invalid
+
+    if args.json_path == "-":
+        json.dump(result, sys.stdout, indent=2)
+        print()
+    elif args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.json_path != "-":
+        print(f"Puzzle dinilai : {len(report)}")
+        print(f"Total skor     : {total:.12f}")
+        if args.baseline:
+            print(f"Baseline       : {result['baseline_total']:.12f} (delta {result['delta']:+.12f})")
+            print(f"Membaik/Memburuk: {len(result['improved'])}/{len(result['regressed'])} puzzle")
+        print(f"Valid          : {'YA' if not invalid else f'TIDAK ({len(invalid)} puzzle)'}")
+        print(f"Waktu          : {time.time() - start:.3f} detik")
+
+    return 0 if not invalid else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
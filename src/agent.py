@@ -1,38 +1,230 @@
 from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.save_util import save_to_zip_file, load_from_zip_file
+from stable_baselines3.common.utils import check_for_correct_spaces
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import json
 import os
+import time
 import numpy as np
+from . import instrument
+
+# Nama file di folder checkpoint per N
+BEST_MODEL = "best_model"     # Model dengan reward rata-rata terbaik
+LATEST_MODEL = "latest"       # Checkpoint periodik terakhir (untuk resume)
+STATE_FILE = "state.json"     # Timestep & reward terbaik saat checkpoint terakhir
+
+def snapshot_model(model):
+    """
+    Salinan konsisten model SB3 (data, parameter + state optimizer, variabel torch),
+    sama dengan isi BaseAlgorithm.save. Diambil di thread training; hasilnya
+    aman ditulis dari thread lain sementara training lanjut mengubah bobot.
+    """
+    exclude = set(model._excluded_save_params())
+    state_dicts_names, torch_variable_names = model._get_torch_save_params()
+    exclude.update(name.split(".")[0] for name in state_dicts_names + torch_variable_names)
+    data = copy.deepcopy({k: v for k, v in model.__dict__.items() if k not in exclude})
+    params = copy.deepcopy(model.get_parameters())
+    pytorch_variables = None
+    if torch_variable_names:
+        pytorch_variables = {}
+        for name in torch_variable_names:
+            obj = model
+            for attr in name.split("."):
+                obj = getattr(obj, attr)
+            pytorch_variables[name] = obj.detach().clone()
+    return data, params, pytorch_variables
+
+def write_snapshot(path, snapshot, state=None):
+    """
+    Tulis snapshot ke path (tanpa .zip) secara atomik: file sementara lalu
+    os.replace, jadi checkpoint yang terbaca tidak pernah setengah jadi walau
+    proses dihentikan di tengah penulisan. state (dict) ditulis ke STATE_FILE.
+    """
+    data, params, pytorch_variables = snapshot
+    tmp_path = path + ".tmp.zip"
+    save_to_zip_file(tmp_path, data=data, params=params, pytorch_variables=pytorch_variables)
+    os.replace(tmp_path, path + ".zip")
+    if state is not None:
+        state_path = os.path.join(os.path.dirname(path), STATE_FILE)
+        with open(state_path + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(state_path + ".tmp", state_path)
+
+def latest_checkpoint(checkpoint_dir):
+    """Path checkpoint periodik terakhir (tanpa .zip) untuk resume, atau None."""
+    path = os.path.join(checkpoint_dir, LATEST_MODEL)
+    return path if os.path.exists(path + ".zip") else None
+
+def load_checkpoint_state(checkpoint_dir):
+    """Isi STATE_FILE di folder checkpoint, atau {} jika belum ada."""
+    path = os.path.join(checkpoint_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def load_compatible(algo, path, env, **kwargs):
+    """
+    algo.load(path, env=env) jika observation/action space checkpoint sama dengan env;
+    None jika tidak (mis. model lama dari sebelum batas rotasi berubah), agar
+    pemanggil melatih ulang secara eksplisit alih-alih gagal dengan ValueError.
+    """
+    data, _, _ = load_from_zip_file(path, device="cpu", load_data=True)
+    try:
+        check_for_correct_spaces(env, data["observation_space"], data["action_space"])
+    except ValueError as e:
+        print(f"Checkpoint {os.path.basename(path)}.zip tidak cocok dengan env "
+              f"({str(e).split(':')[0]}); dilatih ulang.")
+        return None
+    return algo.load(path, env=env, **kwargs)
 
 class SaveOnBestTrainingRewardCallback(BaseCallback):
     """
     Callback untuk menyimpan model setiap kali mencapai reward rata-rata terbaik baru.
+
+    log_dir: folder checkpoint khusus satu N (best_model.zip, latest.zip, state.json),
+    jadi puzzle yang dilatih paralel tidak saling menimpa.
+
+    Penyimpanan dibatasi: rekor baru hanya dihitung jika reward naik lebih dari
+    min_improvement (relatif terhadap |reward terbaik|), dan best_model ditulis paling
+    sering sekali per min_interval detik. Rekor yang tertahan interval di-snapshot
+    saat itu juga dan ditulis begitu interval lewat (atau di akhir training), jadi
+    model terbaik tidak pernah hilang. Setiap save_freq timestep checkpoint
+    "latest" (termasuk state optimizer) ditulis untuk resume. Model di-snapshot di
+    thread training lalu diserialisasi ke disk di thread background.
+
+    metrics_path (opsional): setiap check_freq langkah, tulis satu record JSONL
+    berisi timestep, reward rata-rata, env steps/detik dan snapshot instrumentasi.
     """
-    def __init__(self, check_freq: int, log_dir: str, verbose=1):
+    def __init__(self, check_freq: int, log_dir: str, verbose=1, metrics_path=None, n_trees=None,
+                 save_freq=None, min_improvement=0.0, min_interval=0.0, background=True):
         super(SaveOnBestTrainingRewardCallback, self).__init__(verbose)
         self.check_freq = check_freq
         self.log_dir = log_dir
-        self.save_path = os.path.join(log_dir, 'best_model')
+        self.save_path = os.path.join(log_dir, BEST_MODEL)
+        self.latest_path = os.path.join(log_dir, LATEST_MODEL)
         self.best_mean_reward = -np.inf
+        self.metrics_path = metrics_path
+        self.n_trees = n_trees
+        self.save_freq = save_freq
+        self.min_improvement = min_improvement
+        self.min_interval = min_interval
+        self.background = background
+        self._executor = None        # Thread penulis, dibuat per run training
+        self._writes = []            # Future penulisan di background
+        self._pending_best = None    # (snapshot, state) rekor yang menunggu min_interval
+        self._saved_best_reward = -np.inf
+        self._last_best_save = -np.inf
+        self._last_latest_save = 0
+        self._last_check = (0, time.time())
 
     def _init_callback(self) -> None:
         # Buat folder jika belum ada
-        if self.save_path is not None:
-            os.makedirs(self.save_path, exist_ok=True)
+        os.makedirs(self.log_dir, exist_ok=True)
+        if self.background and self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        # Resume: lanjutkan rekor reward terbaik dari checkpoint sebelumnya
+        state = load_checkpoint_state(self.log_dir)
+        if state.get("best_mean_reward") is not None:
+            self.best_mean_reward = self._saved_best_reward = state["best_mean_reward"]
+        self._last_latest_save = self.num_timesteps
+        self._last_check = (self.num_timesteps, time.time())
 
     def _on_step(self) -> bool:
         if self.n_calls % self.check_freq == 0:
-            
+
             # Cek apakah ada data episode yang tersimpan
             if len(self.model.ep_info_buffer) > 0:
                 # Ambil rata-rata reward dari 100 episode terakhir
                 mean_reward = np.mean([ep_info["r"] for ep_info in self.model.ep_info_buffer])
 
-                # Jika reward lebih baik dari rekor sebelumnya, simpan!
-                if mean_reward > self.best_mean_reward:
+                # Jika reward cukup lebih baik dari rekor sebelumnya, snapshot model ini
+                if self._is_improvement(mean_reward):
                     if self.verbose > 0:
                         print(f"Simpan model terbaik baru di {self.save_path}")
                         print(f"      Reward: {mean_reward:.2f} (Sebelumnya: {self.best_mean_reward:.2f})")
-                    
-                    self.best_mean_reward = mean_reward
-                    self.model.save(self.save_path)
 
-        return True
\ No newline at end of file
+                    self.best_mean_reward = float(mean_reward)
+                    self._pending_best = self._snapshot("save_best", self.best_mean_reward)
+
+            if self.metrics_path:
+                self._write_metrics()
+
+        # Rekor tertunda ditulis begitu min_interval sejak penyimpanan terakhir lewat
+        if self._pending_best is not None and time.time() - self._last_best_save >= self.min_interval:
+            self._write_best()
+
+        if self.save_freq and self.num_timesteps - self._last_latest_save >= self.save_freq:
+            self._last_latest_save = self.num_timesteps
+            self._write(self.latest_path, *self._snapshot("save_checkpoint", self._saved_best_reward))
+
+        return True
+
+    def _on_training_end(self) -> None:
+        # Rekor yang masih tertahan interval tetap disimpan
+        if self._pending_best is not None:
+            self._write_best()
+        # Checkpoint terakhir agar resume mulai tepat dari akhir run ini
+        if self.save_freq:
+            self._write(self.latest_path, *self._snapshot("save_checkpoint", self._saved_best_reward))
+        self.flush()
+        # Thread penulis dimatikan agar callback per N tidak menumpuk thread idle
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _is_improvement(self, mean_reward):
+        if not np.isfinite(self.best_mean_reward):
+            return True
+        return mean_reward > self.best_mean_reward + self.min_improvement * abs(self.best_mean_reward)
+
+    def _snapshot(self, phase, best_mean_reward):
+        """Snapshot model + isi STATE_FILE; best_mean_reward = rekor yang ikut tersimpan."""
+        state = {
+            "n": self.n_trees,
+            "num_timesteps": int(self.num_timesteps),
+            "best_mean_reward": float(best_mean_reward) if np.isfinite(best_mean_reward) else None,
+            "saved_at": time.time(),
+        }
+        with instrument.phase(phase):
+            snapshot = snapshot_model(self.model)
+        return snapshot, state
+
+    def _write_best(self):
+        snapshot, state = self._pending_best
+        self._pending_best = None
+        self._saved_best_reward = state["best_mean_reward"]
+        self._last_best_save = time.time()
+        self._write(self.save_path, snapshot, state)
+
+    def _write(self, path, snapshot, state):
+        if self._executor is None:
+            write_snapshot(path, snapshot, state)
+            return
+        # Buang penulisan yang sudah selesai; error penulisan dimunculkan di sini
+        for future in [f for f in self._writes if f.done()]:
+            self._writes.remove(future)
+            future.result()
+        self._writes.append(self._executor.submit(write_snapshot, path, snapshot, state))
+
+    def flush(self):
+        """Tunggu semua penulisan checkpoint di background selesai."""
+        for future in self._writes:
+            future.result()
+        self._writes = []
+
+    def _write_metrics(self):
+        last_steps, last_time = self._last_check
+        now = time.time()
+        rewards = [ep_info["r"] for ep_info in self.model.ep_info_buffer]
+        instrument.write_record(
+            self.metrics_path,
+            event="train_check",
+            n=self.n_trees,
+            timesteps=self.num_timesteps,
+            mean_reward=float(np.mean(rewards)) if rewards else None,
+            best_mean_reward=float(self.best_mean_reward),
+            steps_per_sec=(self.num_timesteps - last_steps) / max(now - last_time, 1e-9),
+        )
+        self._last_check = (self.num_timesteps, now)
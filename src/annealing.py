@@ -0,0 +1,356 @@
+import math
+import time
+import numpy as np
+from .geometry import layout_side
+from . import instrument
+from .collision import active_trees
+from .penetration import PIECE_VERTICES, PIECE_NORMALS, SatScratch, piece_pair_depths, has_overlap
+
+# Jarak minimum antar potongan (sepanjang sumbu SAT) agar layout tetap valid
+# setelah koordinat dibulatkan ke 6 desimal saat submit (geser <= ~1e-6 per pasangan)
+CLEARANCE = 2e-6
+
+# Peluang tiap jenis gerakan: geser, putar, dorong ke pusat, tukar posisi
+MOVE_PROBS = {"translate": 0.45, "rotate": 0.25, "push": 0.2, "swap": 0.1}
+
+# Jumlah usulan gerakan yang dicek tabrakannya sekaligus (lihat anneal)
+BATCH_MOVES = 16
+
+def _boxes_touch(a, b, margin):
+    """AABB a (..., 4) bersentuhan dengan b (M, 4) dalam jarak margin -> (..., M) bool."""
+    return ((b[:, 0] <= a[..., 2, None] + margin) & (b[:, 2] >= a[..., 0, None] - margin) &
+            (b[:, 1] <= a[..., 3, None] + margin) & (b[:, 3] >= a[..., 1, None] - margin))
+
+class FeasibleLayout:
+    """
+    Layout N pohon yang selalu bebas overlap, dengan cek tabrakan per pohon.
+
+    Per pohon disimpan tabel potongan konveks yang sudah diputar (verteks,
+    normal dan AABB potongan relatif terhadap titik pohon), jadi geser, dorong
+    dan tukar posisi cukup menambahkan offset; rotasi hanya dihitung ulang
+    untuk pohon yang diputar. Baris sesudah N adalah slot pose usulan: dua untuk
+    propose() dan 2 * batch_size untuk propose_batch().
+
+    Pose usulan disaring ke pohon tetangga lewat AABB pohon, lalu semua pasangan
+    (slot, tetangga) dan (slot, slot pasangan tukar) dicek sekaligus dengan
+    piece_pair_depths (AABB potongan lalu SAT 8 sumbu) di buffer scratch yang
+    dipakai ulang. Bounding box layout dihitung ulang dari AABB saja.
+    """
+    def __init__(self, state, n_trees, clearance=CLEARANCE, batch_size=BATCH_MOVES):
+        self.n_trees = n_trees
+        self.clearance = clearance
+        self.state = np.array(state, dtype=np.float64)[:n_trees * 3].reshape(n_trees, 3)
+        rows = n_trees + 2 + 2 * batch_size
+        self._slots = np.arange(n_trees, n_trees + 2)
+        self._batch_slots = np.arange(n_trees + 2, rows)
+        self.local_verts = np.empty((rows,) + PIECE_VERTICES.shape)    # (rows, 4, 4, 2)
+        self.normals = np.empty_like(self.local_verts)
+        self.local_lo = np.empty((rows, 4, 2))                          # AABB potongan relatif
+        self.local_hi = np.empty_like(self.local_lo)
+        self.local_boxes = np.empty((rows, 4))                          # AABB pohon relatif
+        self.verts = np.empty_like(self.local_verts)
+        self.lo = np.empty_like(self.local_lo)
+        self.hi = np.empty_like(self.local_lo)
+        self.boxes = np.empty((rows, 4))
+        self._tables = (self.local_verts, self.normals, self.local_lo, self.local_hi, self.local_boxes)
+        self._world = (self.verts, self.lo, self.hi, self.boxes)
+        self._sat = SatScratch()
+
+        trees = np.arange(n_trees)
+        self._rotate(trees, self.state[:, 2])
+        self._place(trees, self.state)
+        self.bounds = self._bounds(self.tree_boxes)
+
+    @property
+    def tree_boxes(self):
+        """AABB pohon layout saat ini (N, 4), tanpa slot usulan."""
+        return self.boxes[:self.n_trees]
+
+    def _rotate(self, rows, degs):
+        """Isi tabel potongan terputar (relatif titik pohon) untuk baris rows."""
+        rad = np.radians(degs)
+        c, s = np.cos(rad), np.sin(rad)
+        rot_t = np.empty((len(rows), 1, 2, 2))                          # R transpose
+        rot_t[:, 0, 0, 0] = rot_t[:, 0, 1, 1] = c
+        rot_t[:, 0, 0, 1] = s
+        rot_t[:, 0, 1, 0] = -s
+        verts = np.matmul(PIECE_VERTICES, rot_t)
+        self.local_verts[rows] = verts
+        self.normals[rows] = np.matmul(PIECE_NORMALS, rot_t)
+        lo = self.local_lo[rows] = verts.min(axis=-2)
+        hi = self.local_hi[rows] = verts.max(axis=-2)
+        self.local_boxes[rows, :2] = lo.min(axis=-2)
+        self.local_boxes[rows, 2:] = hi.max(axis=-2)
+
+    def _place(self, rows, poses, tables=None):
+        """Koordinat dunia baris rows dari tabel terputar baris tables (default rows)."""
+        tables = rows if tables is None else tables
+        xy = poses[:, :2]
+        self.verts[rows] = self.local_verts[tables] + xy[:, None, None]
+        self.lo[rows] = self.local_lo[tables] + xy[:, None]
+        self.hi[rows] = self.local_hi[tables] + xy[:, None]
+        self.boxes[rows] = self.local_boxes[tables] + np.tile(xy, 2)
+
+    def _fill(self, slots, idx, poses):
+        """Tulis pose usulan pohon idx ke slots. Return mask slot yang rotasinya berubah."""
+        rotated = poses[:, 2] != self.state[idx, 2]
+        if rotated.any():
+            # Tabel slot: salin milik pohon idx, lalu putar ulang yang rotasinya berubah
+            for table in self._tables:
+                table[slots] = table[idx]
+            self._rotate(slots[rotated], poses[rotated, 2])
+            self._place(slots, poses)
+        else:
+            # Rotasi tetap (geser, dorong, tukar): cukup offset dari tabel pohon idx
+            self.normals[slots] = self.normals[idx]
+            self._place(slots, poses, tables=idx)
+        return rotated
+
+    def _colliding_slots(self, slots, idx, partner):
+        """
+        Cek pose di slots (untuk pohon idx) terhadap semua pohon lain, kecuali
+        pohon partner dari usulan yang sama (idx sendiri untuk gerakan satu pohon);
+        slot usulan tukar juga dicek terhadap slot pasangannya (baris berurutan).
+        Return: (near (S, N) pohon tetangga yang dicek, hit (S,) slot yang menabrak).
+        """
+        near = _boxes_touch(self.boxes[slots], self.tree_boxes, self.clearance)
+        rows = np.arange(len(slots))
+        near[rows, idx] = False
+        near[rows, partner] = False
+        k, j = np.nonzero(near)
+        first = np.flatnonzero(partner != idx)[::2]
+        i = np.concatenate([slots[k], slots[first]])
+        j = np.concatenate([j, slots[first + 1]])
+        hit = np.zeros(len(slots), dtype=bool)
+        if len(i):
+            pair, depths = piece_pair_depths(self.verts, self.normals, i, j, self.clearance,
+                                             boxes=(self.lo, self.hi), scratch=self._sat)
+            hit[np.concatenate([k, first])[pair[depths > 0]]] = True
+        return near, hit
+
+    def bounds_with(self, idx, slots):
+        """Bounding box layout jika AABB pohon idx diganti AABB slots."""
+        boxes = self.tree_boxes
+        old = boxes[idx].copy()
+        boxes[idx] = self.boxes[slots]
+        bounds = self._bounds(boxes)
+        boxes[idx] = old
+        return bounds
+
+    @staticmethod
+    def _bounds(boxes):
+        return np.concatenate([boxes[:, :2].min(axis=0), boxes[:, 2:].max(axis=0)])
+
+    @staticmethod
+    def side_of(bounds):
+        return max(bounds[2] - bounds[0], bounds[3] - bounds[1])
+
+    @property
+    def side(self):
+        return self.side_of(self.bounds)
+
+    def flat_state(self):
+        return self.state.ravel().copy()
+
+    def active_trees(self, margin=0.1):
+        """Pohon boundary + tetangga penghalangnya (lihat collision.active_trees)."""
+        return active_trees(self.tree_boxes, self.bounds, margin=margin)
+
+    def propose(self, idx, poses):
+        """
+        Coba pose baru (k, 3) untuk pohon idx. Return (bounds_baru, cache) jika
+        bebas overlap, atau None. Pose usulan disimpan di slot; layout belum
+        berubah sampai commit() dipanggil (sebelum propose berikutnya).
+        """
+        slots = self._slots[:len(idx)]
+        rotated = self._fill(slots, idx, poses)
+        _, hit = self._colliding_slots(slots, idx, idx[::-1])
+        if hit.any():
+            return None
+        return self.bounds_with(idx, slots), (poses, slots, rotated.any())
+
+    def propose_batch(self, idx, poses, partner):
+        """
+        Cek banyak usulan sekaligus terhadap layout saat ini. idx, poses, partner:
+        per pohon yang dipindah (S,), (S, 3), (S,); usulan tukar = dua baris
+        berurutan dengan partner saling menunjuk. Semua usulan dicek dalam satu
+        panggilan SAT; pose disimpan di slot batch sampai propose_batch berikutnya.
+        Return: (slots, rotated, near, hit) per baris, lihat _colliding_slots.
+        """
+        slots = self._batch_slots[:len(idx)]
+        rotated = self._fill(slots, idx, poses)
+        near, hit = self._colliding_slots(slots, idx, partner)
+        return slots, rotated, near, hit
+
+    def commit(self, idx, bounds, cache):
+        poses, slots, rotated = cache
+        self.state[idx] = poses
+        for arr in self._tables + self._world if rotated else self._world:
+            arr[idx] = arr[slots]
+        self.bounds = bounds
+
+def _feasible_start(state, n_trees):
+    """Pastikan titik awal bebas overlap (hasil squeezer penalti bisa sedikit tumpang tindih)."""
+    state = np.asarray(state, dtype=np.float64)[:n_trees * 3]
+    if has_overlap(state, n_trees):
+        from .optimizer import _separate
+        state = _separate(state, n_trees)
+    return state
+
+def _draw_move(rng, layout, kind, i, step_xy, step_deg):
+    """Usulan gerakan pohon i: (idx, poses), atau None jika tidak bisa dibuat."""
+    n_trees = layout.n_trees
+    if kind == "swap":
+        if n_trees < 2:
+            return None
+        j = int(rng.integers(n_trees - 1))
+        j += j >= i
+        idx = np.array([i, j])
+        poses = layout.state[idx].copy()
+        poses[:, :2] = poses[::-1, :2]
+        return idx, poses
+    idx = np.array([i])
+    poses = layout.state[idx].copy()
+    if kind == "translate":
+        poses[0, :2] += rng.uniform(-step_xy, step_xy, 2)
+    elif kind == "rotate":
+        poses[0, 2] = (poses[0, 2] + rng.uniform(-step_deg, step_deg)) % 360.0
+    else:
+        b = layout.bounds
+        d = np.array([(b[0] + b[2]) / 2, (b[1] + b[3]) / 2]) - poses[0, :2]
+        norm = math.hypot(d[0], d[1])
+        if norm == 0:
+            return None
+        poses[0, :2] += d * (rng.uniform(0, step_xy) / norm)
+    return idx, poses
+
+def anneal(initial_state, n_trees, n_steps=None, time_budget=60.0, t_start=1e-3, t_end=1e-6,
+           step_xy=0.05, step_deg=5.0, target_accept=0.3, adapt_every=256,
+           move_probs=None, boundary_focus=0.5, focus_margin=0.1, batch_size=BATCH_MOVES,
+           rng=None, verbose=True):
+    """
+    Simulated annealing di atas layout yang selalu valid (tanpa overlap).
+
+    Gerakan per pohon: geser, putar, dorong ke pusat layout, dan tukar posisi
+    dua pohon. Energi = sisi bounding square; gerakan yang membuat overlap
+    langsung ditolak, sisanya diterima dengan kriteria Metropolis. Suhu turun
+    geometrik dari t_start ke t_end sepanjang n_steps (atau time_budget detik).
+    Ukuran langkah diadaptasi setiap adapt_every gerakan agar rasio penerimaan
+    mendekati target_accept.
+
+    Usulan dibuat per batch_size sekaligus dari layout awal batch dan dicek
+    tabrakannya dalam satu panggilan (FeasibleLayout.propose_batch), lalu
+    diputuskan berurutan. Hasil cek tetap sah selama pohon yang berubah di batch
+    itu tidak bersentuhan dengan usulan; jika bersentuhan usulan dicek ulang
+    sendiri, dan usulan untuk pohon yang sudah berubah dibuang.
+
+    Dengan peluang boundary_focus, pohon yang digerakkan dipilih dari subruang
+    aktif (pohon boundary + tetangga penghalang dalam focus_margin), karena
+    hanya pohon-pohon itu yang bisa mengecilkan sisi. Subruang aktif dihitung
+    ulang hanya jika bounding box layout berubah.
+
+    Return: (final_side, final_coords) seperti squeeze_solution.
+    """
+    rng = np.random.default_rng(rng)
+    probs = dict(MOVE_PROBS, **(move_probs or {}))
+    kinds = list(probs)
+    cum = np.cumsum([probs[k] for k in kinds])
+    cum /= cum[-1]
+
+    layout = FeasibleLayout(_feasible_start(initial_state, n_trees), n_trees, batch_size=batch_size)
+    clearance = layout.clearance
+    energy = layout.side
+    active = layout.active_trees(focus_margin) if boundary_focus else None
+    best_energy, best_state = energy, layout.flat_state()
+
+    start = time.time()
+    step = next_adapt = 0
+    tried = accepted = window_accepted = 0
+    log_ratio = math.log(t_end / t_start)
+    temp = t_start
+    while True:
+        if n_steps is not None:
+            progress = step / n_steps
+        else:
+            progress = (time.time() - start) / time_budget
+        if progress >= 1.0:
+            break
+        if step >= next_adapt:
+            temp = t_start * math.exp(log_ratio * progress)
+            if step:
+                # Sesuaikan langkah: terlalu sering diterima -> langkah diperbesar
+                rate = window_accepted / adapt_every
+                factor = 1.1 if rate > target_accept else 1 / 1.1
+                step_xy = min(max(step_xy * factor, 1e-6), 0.5)
+                step_deg = min(max(step_deg * factor, 1e-4), 45.0)
+                window_accepted = 0
+            next_adapt += adapt_every
+        size = batch_size if n_steps is None else min(batch_size, n_steps - step)
+        step += size
+
+        moves = []
+        for _ in range(size):
+            kind = kinds[int(np.searchsorted(cum, rng.random()))]
+            if boundary_focus and rng.random() < boundary_focus:
+                if active is None:
+                    active = layout.active_trees(focus_margin)
+                i = int(active[rng.integers(len(active))])
+            else:
+                i = int(rng.integers(n_trees))
+            move = _draw_move(rng, layout, kind, i, step_xy, step_deg)
+            if move is not None:
+                moves.append(move)
+        if not moves:
+            continue
+        idx = np.concatenate([m[0] for m in moves])
+        slots, rotated, near, hit = layout.propose_batch(
+            idx, np.concatenate([m[1] for m in moves]), np.concatenate([m[0][::-1] for m in moves]))
+
+        changed = []    # Pohon yang sudah berubah di batch ini
+        row = 0
+        for move_idx, poses in moves:
+            rows = slice(row, row + len(move_idx))
+            row += len(move_idx)
+            collides = bool(hit[rows].any())
+            stale = False
+            if changed:
+                if any(t in changed for t in move_idx.tolist()):
+                    continue
+                # Hasil cek batch basi jika pohon yang sudah berubah ikut dicek
+                # (saat menabrak) atau kini bersentuhan dengan pose usulan
+                if collides:
+                    stale = bool(near[rows][:, changed].any())
+                else:
+                    stale = bool(_boxes_touch(layout.boxes[slots[rows]], layout.boxes[changed], clearance).any())
+            tried += 1
+            if stale:
+                result = layout.propose(move_idx, poses)
+            elif collides:
+                result = None
+            else:
+                result = (layout.bounds_with(move_idx, slots[rows]),
+                          (poses, slots[rows], bool(rotated[rows].any())))
+            if result is None:
+                continue
+            new_energy = layout.side_of(result[0])
+            delta = new_energy - energy
+            if delta <= 0 or rng.random() < math.exp(-delta / temp):
+                if boundary_focus and not np.array_equal(result[0], layout.bounds):
+                    active = None
+                layout.commit(move_idx, *result)
+                changed.extend(move_idx.tolist())
+                energy = new_energy
+                accepted += 1
+                window_accepted += 1
+                if energy < best_energy - 1e-12:
+                    best_energy, best_state = energy, layout.flat_state()
+
+    elapsed = time.time() - start
+    instrument.count("anneal.moves", tried)
+    instrument.count("anneal.accepted", accepted)
+    if verbose:
+        print(f"   Annealing: {tried} gerakan ({tried / max(elapsed, 1e-9) * 60:,.0f}/menit), "
+              f"diterima {accepted / max(tried, 1):.1%}, sisi terbaik {best_energy:.6f}")
+
+    final_side = float(layout_side(best_state, n_trees))
+    return final_side, best_state
@@ -0,0 +1,151 @@
+import os
+import numpy as np
+from .scoring import read_submission
+
+# --- FORMAT ARSIP LAYOUT (biner, little-endian) ---
+# [magic 8 byte][jumlah puzzle K: uint64][index K x (n, offset_baris): int64]
+# [data: float64 (total_pohon, 3) berisi x, y, deg]
+# Semua layout disimpan berurutan (urut N); offset_baris menunjuk baris pertama
+# puzzle di blok data. Header dan index kelipatan 8 byte, jadi blok data selalu
+# aligned dan bisa di-memmap langsung tanpa salinan.
+MAGIC = b"TREELAY1"
+_HEADER = np.dtype([("magic", "S8"), ("count", "<u8")])
+_INDEX = np.dtype([("n", "<i8"), ("offset", "<i8")])
+_DATA = np.dtype("<f8")
+
+def write_archive(path, puzzles):
+    """
+    Tulis semua layout {n: state (n, 3) / flat n*3} ke satu file arsip.
+    Ditulis ke file sementara lalu os.replace: pembaca tidak pernah melihat arsip setengah jadi.
+    """
+    ns = sorted(int(n) for n in puzzles)
+    states = [np.asarray(puzzles[n], dtype=_DATA).reshape(n, 3) for n in ns]
+    index = np.zeros(len(ns), dtype=_INDEX)
+    index["n"] = ns
+    index["offset"] = np.concatenate([[0], np.cumsum(ns)[:-1]]) if ns else []
+    header = np.array([(MAGIC, len(ns))], dtype=_HEADER)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header.tobytes())
+        f.write(index.tobytes())
+        for state in states:
+            f.write(state.tobytes())
+    os.replace(tmp_path, path)
+
+class LayoutArchive:
+    """
+    Pembaca arsip layout berbasis np.memmap (read-only).
+
+    archive[n] mengembalikan view (n, 3) langsung ke file (zero-copy); hanya
+    halaman yang disentuh yang dibaca dari disk. `states` adalah seluruh blok
+    data (total_pohon, 3) dan `offsets` baris awal tiap puzzle, urut N.
+    """
+    def __init__(self, path):
+        self.path = path
+        header = np.fromfile(path, dtype=_HEADER, count=1)
+        if len(header) == 0 or header["magic"][0] != MAGIC:
+            raise ValueError(f"{path} bukan arsip layout (magic {MAGIC!r} tidak ditemukan)")
+        count = int(header["count"][0])
+
+        index = np.fromfile(path, dtype=_INDEX, count=count, offset=_HEADER.itemsize)
+        self.ns = index["n"].copy()
+        self.offsets = index["offset"].copy()
+        self._row = {int(n): int(off) for n, off in zip(self.ns, self.offsets)}
+
+        total = int(self.ns.sum())
+        data_offset = _HEADER.itemsize + count * _INDEX.itemsize
+        if total:
+            self.states = np.memmap(path, dtype=_DATA, mode="r", offset=data_offset, shape=(total, 3))
+        else:
+            self.states = np.empty((0, 3), dtype=_DATA)
+
+    def __len__(self):
+        return len(self.ns)
+
+    def __contains__(self, n):
+        return n in self._row
+
+    def __iter__(self):
+        return iter(self._row)
+
+    def __getitem__(self, n):
+        off = self._row[n]
+        return self.states[off:off + n]
+
+    def get(self, n, default=None):
+        return self[n] if n in self._row else default
+
+    def items(self):
+        for n in self._row:
+            yield n, self[n]
+
+    def to_dict(self):
+        """{n: view (n, 3)}; format yang sama dengan scoring.read_submission."""
+        return dict(self.items())
+
+def _format_lossless(values):
+    """
+    Float -> string terpendek yang round-trip persis (repr), tanpa notasi
+    eksponen agar tetap terbaca oleh parser submission.
+    """
+    out = []
+    for v in values.tolist():
+        s = repr(v)
+        if "e" in s or "E" in s:
+            s = np.format_float_positional(v, unique=True, trim="-")
+        out.append(s)
+    return out
+
+def export_csv(path, puzzles, decimals=None):
+    """
+    Tulis layout {n: state (n, 3)} sebagai CSV submission (id,x,y,deg berprefix 's').
+    decimals=None: lossless (read_submission mengembalikan float yang persis sama);
+    decimals=k: dibulatkan ke k desimal (mis. 6 untuk submission Kaggle).
+    """
+    ns = sorted(puzzles)
+    states = np.concatenate([np.asarray(puzzles[n], dtype=np.float64).reshape(n, 3) for n in ns])
+    ids = [f"{n:03d}_{i}" for n in ns for i in range(n)]
+    if decimals is None:
+        cols = [_format_lossless(states[:, k]) for k in range(3)]
+    else:
+        cols = [np.char.mod(f"%.{decimals}f", states[:, k]).tolist() for k in range(3)]
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline="") as f:
+        f.write("id,x,y,deg\n")
+        f.writelines(f"{i},s{x},s{y},s{d}\n" for i, x, y, d in zip(ids, *cols))
+    os.replace(tmp_path, path)
+
+def puzzles_from_rows(rows):
+    """
+    Format lama (list dict {"id", "x", "y", "deg"} per pohon) -> {n: state (n, 3)}.
+    Puzzle yang pohonnya tidak lengkap dilewati.
+    """
+    grouped = {}
+    for item in rows:
+        pid, idx = item["id"].split("_")
+        grouped.setdefault(int(pid), {})[int(idx)] = (item["x"], item["y"], item["deg"])
+    return {
+        n: np.array([trees[i] for i in range(n)], dtype=np.float64)
+        for n, trees in sorted(grouped.items())
+        if sorted(trees) == list(range(n))
+    }
+
+def import_csv(csv_path, archive_path):
+    """Konversi CSV submission ke arsip biner (lossless). Return jumlah puzzle."""
+    puzzles = read_submission(csv_path)
+    write_archive(archive_path, puzzles)
+    return len(puzzles)
+
+def load_puzzles(path):
+    """
+    Muat layout dari CSV submission atau arsip biner (dikenali dari magic),
+    sebagai {n: state (n, 3)}.
+    """
+    with open(path, "rb") as f:
+        is_archive = f.read(len(MAGIC)) == MAGIC
+    if is_archive:
+        return LayoutArchive(path).to_dict()
+    return read_submission(path)
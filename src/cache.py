@@ -0,0 +1,59 @@
+from collections import OrderedDict
+from . import instrument
+from .symmetry import canonical_key, CANONICAL_DECIMALS
+
+# Jumlah entri maksimum cache cost (key 16 byte + float, jadi ~100 byte per entri)
+COST_CACHE_SIZE = 100_000
+
+class CostCache:
+    """
+    Cache LRU terbatas untuk fungsi cost layout, dengan key kanonik
+    (translasi, rotasi 90 deg, cermin, permutasi; lihat symmetry.canonical_key).
+
+    Dipakai sebagai pengganti langsung fungsi cost di scipy.optimize.minimize:
+    `CostCache(objective_function)(x, n_trees, base_poly)`. Cost harus invarian
+    terhadap simetri tersebut (sisi bounding square + penalti overlap memenuhi ini).
+    Statistik hit/miss tersedia lewat stats() dan counter instrumentasi cache.*.
+    """
+    def __init__(self, fn, maxsize=COST_CACHE_SIZE, decimals=CANONICAL_DECIMALS):
+        self.fn = fn
+        self.maxsize = maxsize
+        self.decimals = decimals
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __call__(self, flat_params, n_trees, *args):
+        key = (n_trees, canonical_key(flat_params, n_trees, self.decimals))
+        cost = self._entries.get(key)
+        if cost is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            instrument.count("cache.hits")
+            return cost
+
+        cost = self.fn(flat_params, n_trees, *args)
+        self.misses += 1
+        instrument.count("cache.misses")
+        self._entries[key] = cost
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return cost
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Kosongkan cache dan reset statistik."""
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        calls = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / calls if calls else 0.0,
+        }
@@ -0,0 +1,135 @@
+import numpy as np
+from . import instrument
+
+# Broad phase di modul ini murni NumPy; Shapely di-import lazy hanya oleh
+# fungsi narrow phase exact (intersecting_pairs, pair_overlap_areas)
+
+def aabb_from_vertices(vertices):
+    """
+    Bounding box per pohon dari tensor verteks (..., N, 15, 2) -> (..., N, 4).
+    Format tiap baris: [min_x, min_y, max_x, max_y].
+    """
+    return np.concatenate([vertices.min(axis=-2), vertices.max(axis=-2)], axis=-1)
+
+def candidate_pairs(boxes):
+    """
+    Broad phase sweep-and-prune: mencari pasangan pohon (i < j) yang AABB-nya
+    bersentuhan atau beririsan. Pasangan yang pasti berjauhan tidak dikembalikan.
+
+    boxes: (N, 4) -> (i, j) berupa dua array indeks.
+    """
+    boxes = np.asarray(boxes)
+    n = len(boxes)
+    if n < 2:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+
+    # Urutkan berdasarkan min_x, lalu setiap pohon hanya perlu dicek dengan
+    # pohon-pohon sesudahnya yang min_x-nya masih <= max_x miliknya
+    order = np.argsort(boxes[:, 0], kind="stable")
+    b = boxes[order]
+    ends = np.searchsorted(b[:, 0], b[:, 2], side="right")
+    counts = np.maximum(ends - np.arange(n) - 1, 0)
+
+    ii = np.repeat(np.arange(n), counts)
+    starts = np.cumsum(counts) - counts
+    jj = ii + 1 + (np.arange(counts.sum()) - np.repeat(starts, counts))
+
+    # Sumbu y: buang pasangan yang tidak beririsan secara vertikal
+    keep = (b[ii, 1] <= b[jj, 3]) & (b[jj, 1] <= b[ii, 3])
+    i, j = order[ii[keep]], order[jj[keep]]
+    return np.minimum(i, j), np.maximum(i, j)
+
+def batch_candidate_pairs(boxes, chunk_pairs=250_000):
+    """
+    Broad phase untuk batch layout sekaligus: boxes (B, N, 4) -> (b, i, j).
+    Uji AABB semua pasangan (i < j) dilakukan dengan broadcast, dipecah per
+    potongan batch agar memori tetap kecil.
+    """
+    boxes = np.asarray(boxes)
+    n_batch, n = boxes.shape[:2]
+    iu, ju = np.triu_indices(n, 1)
+    step = max(1, chunk_pairs // max(len(iu), 1))
+
+    bs, is_, js = [], [], []
+    for start in range(0, n_batch, step):
+        a = boxes[start:start + step, iu]
+        c = boxes[start:start + step, ju]
+        mask = ((a[..., 0] <= c[..., 2]) & (c[..., 0] <= a[..., 2]) &
+                (a[..., 1] <= c[..., 3]) & (c[..., 1] <= a[..., 3]))
+        b, p = np.nonzero(mask)
+        bs.append(b + start)
+        is_.append(iu[p])
+        js.append(ju[p])
+
+    if not bs:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty, empty
+    return np.concatenate(bs), np.concatenate(is_), np.concatenate(js)
+
+def boundary_trees(boxes, bounds, tol=1e-9):
+    """
+    Pohon yang menentukan bounding box layout: AABB-nya menyentuh salah satu
+    dari min_x, min_y, max_x, max_y (dalam toleransi tol). boxes (N, 4) -> indeks.
+    """
+    b = np.asarray(boxes)
+    return np.flatnonzero(
+        (b[:, 0] <= bounds[0] + tol) | (b[:, 1] <= bounds[1] + tol) |
+        (b[:, 2] >= bounds[2] - tol) | (b[:, 3] >= bounds[3] - tol)
+    )
+
+def active_trees(boxes, bounds, tol=1e-9, margin=0.1):
+    """
+    Subruang aktif untuk optimasi: pohon boundary ditambah tetangga yang
+    menghalanginya (AABB berjarak <= margin dari AABB pohon boundary).
+    Hanya pohon-pohon ini yang bisa mengecilkan bounding square.
+    """
+    b = np.asarray(boxes)
+    edge = b[boundary_trees(b, bounds, tol)]
+    near = ((b[:, None, 0] <= edge[None, :, 2] + margin) & (edge[None, :, 0] - margin <= b[:, None, 2]) &
+            (b[:, None, 1] <= edge[None, :, 3] + margin) & (edge[None, :, 1] - margin <= b[:, None, 3]))
+    return np.flatnonzero(near.any(axis=1))
+
+def intersecting_pairs(polys):
+    """
+    Pasangan (i < j) yang poligonnya bersinggungan/beririsan.
+    Memakai STRtree Shapely: broad phase dan predikat intersects berjalan di C.
+    """
+    import shapely
+    polys = np.asarray(polys, dtype=object)
+    if len(polys) < 2:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    with instrument.timer("shapely"):
+        tree = shapely.STRtree(polys)
+        src, dst = tree.query(polys, predicate="intersects")
+    mask = src < dst
+    n_hit = int(mask.sum())
+    instrument.count("overlap.pairs_exact", n_hit)
+    instrument.count("overlap.pairs_pruned", len(polys) * (len(polys) - 1) // 2 - n_hit)
+    return src[mask], dst[mask]
+
+def pair_overlap_areas(polys, i, j):
+    """Luas irisan exact (Shapely) untuk pasangan (i[k], j[k]) yang sudah diketahui."""
+    import shapely
+    polys = np.asarray(polys, dtype=object)
+    if len(i) == 0:
+        return np.empty(0)
+    with instrument.timer("shapely"):
+        return shapely.area(shapely.intersection(polys[i], polys[j]))
+
+def overlap_pairs(polys):
+    """
+    Luas irisan untuk setiap pasangan kandidat hasil broad phase.
+    Return: (i, j, areas) — hanya pasangan yang bersinggungan yang dihitung exact.
+    """
+    polys = np.asarray(polys, dtype=object)
+    i, j = intersecting_pairs(polys)
+    return i, j, pair_overlap_areas(polys, i, j)
+
+def total_overlap_area(polys):
+    """
+    Total luas overlap semua pasangan pohon (pengganti loop O(N^2)).
+    """
+    _, _, areas = overlap_pairs(polys)
+    return float(areas.sum())
@@ -7,11 +7,18 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 RAW_DATA_DIR = os.path.join(DATA_DIR, "raw")
 PROCESSED_DATA_DIR = os.path.join(DATA_DIR, "processed")
 MODELS_DIR = os.path.join(BASE_DIR, "models")
+CHECKPOINTS_DIR = os.path.join(MODELS_DIR, "checkpoints")  # Checkpoint training, satu subfolder per N
 SUBMISSIONS_DIR = os.path.join(BASE_DIR, "submissions")
+ARCHIVE_PATH = os.path.join(PROCESSED_DATA_DIR, "best_layouts.bin")  # Arsip biner semua layout terbaik
 
-os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
-os.makedirs(MODELS_DIR, exist_ok=True)
-os.makedirs(SUBMISSIONS_DIR, exist_ok=True)
+def ensure_dirs():
+    """
+    Buat folder output (processed, models, submissions) jika belum ada.
+    Dipanggil oleh entry point yang menulis file, bukan saat config di-import,
+    sehingga skrip read-only (scoring/validasi) tidak punya efek samping.
+    """
+    for path in (PROCESSED_DATA_DIR, MODELS_DIR, SUBMISSIONS_DIR):
+        os.makedirs(path, exist_ok=True)
 
 # --- HYPERPARAMETERS (Pengaturan AI) ---
 RL_ALGORITHM = "PPO"
@@ -20,6 +27,42 @@ LEARNING_RATE = 0.0003
 N_STEPS = 2048           # Buffer size sebelum update
 BATCH_SIZE = 64
 GAMMA = 0.99             # Diskon reward masa depan
+N_ENVS = 64              # Env paralel di ChristmasTreeVecEnv (satu proses)
+
+# --- CHECKPOINT (Lihat src/agent.py) ---
+CHECKPOINT_FREQ = 50000             # Checkpoint "latest" (untuk resume) setiap sekian timestep
+CHECKPOINT_MIN_IMPROVEMENT = 0.01   # Simpan best_model hanya jika reward naik > 1% dari rekor
+CHECKPOINT_MIN_INTERVAL = 60.0      # Jeda minimum antar penyimpanan best_model (detik)
+
+# --- REWARD (Lihat src/reward.py) ---
+# Term: side, area, overlap, pair_distance; awalan "delta_" = reward perbaikan per step
+REWARD_TERMS = {"area": 1.0, "overlap": 10000.0}   # Default = reward lama
+MAX_EPISODE_STEPS = 200   # Episode di-truncate agar rollout PPO terbatas & Monitor mencatat episode
+
+# --- SQUEEZER MULTI-START ---
+N_STARTS = 8                 # Jumlah rollout RL sebagai titik awal squeezer
+SQUEEZE_TIME_BUDGET = 600.0  # Anggaran waktu squeeze per puzzle (detik)
+SQUEEZE_WORKERS = 1          # Proses paralel untuk multi-start (1 jika scheduler sudah paralel)
+ANNEAL_TIME_BUDGET = 300.0   # Simulated annealing setelah squeeze (detik), 0 = nonaktif
+
+# --- SEEDING (Warm start layout awal) ---
+USE_SEEDING = True   # Mulai dari lattice / solusi N-1, N+1 di store, bukan tumpukan acak
+SEED_NOISE = 0.5     # Noise reset env dari seed (dalam satuan skala gerakan)
+
+# --- KURIKULUM (Transfer antar ukuran puzzle) ---
+POLICY_TYPE = "MlpPolicy"        # "MlpPolicy" atau "TreeSetPolicy" (tidak bergantung N)
+USE_CURRICULUM = False           # Latih N naik berurutan dengan warm start dari N sebelumnya
+CURRICULUM_TIMESTEPS = 100000    # Langkah tambahan per N setelah warm start
+
+# --- INSTRUMENTASI ---
+INSTRUMENT = True                                             # Counter & timer hot path per puzzle
+METRICS_PATH = os.path.join(PROCESSED_DATA_DIR, "metrics.jsonl")  # Satu record JSON per baris
+
+# --- SCHEDULER (Paralel antar puzzle) ---
+N_WORKERS = os.cpu_count() or 1   # Jumlah puzzle yang dikerjakan bersamaan
+CUDA_WORKERS_PER_DEVICE = 1       # Batas worker PPO per GPU (train_with_cuda); 1 konteks CUDA per device
+PUZZLE_RETRIES = 1                # Percobaan ulang jika puzzle gagal
+PUZZLE_TIMEOUT = None             # Batas waktu per puzzle (detik), None = tanpa batas
 
 # --- GEOMETRY CONSTANTS ---
 # Batas dunia simulasi
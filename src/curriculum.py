@@ -0,0 +1,68 @@
+import os
+import time
+import zipfile
+from stable_baselines3 import PPO
+from stable_baselines3.common.save_util import json_to_data
+from .policy import TreeSetPolicy
+from .agent import latest_checkpoint, load_compatible
+
+def _is_tree_set_model(path):
+    """True jika checkpoint (tanpa .zip) disimpan dengan TreeSetPolicy; hanya metadata yang dibaca."""
+    with zipfile.ZipFile(path + ".zip") as archive:
+        data = json_to_data(archive.read("data").decode())
+    policy_class = data.get("policy_class")
+    return isinstance(policy_class, type) and issubclass(policy_class, TreeSetPolicy)
+
+def _nearest_smaller_model(n, model_path_for, n_min=1):
+    """
+    Checkpoint TreeSetPolicy dengan N terbesar yang masih < n, atau None.
+    Model lain di path yang sama (mis. MlpPolicy dari jalur non-kurikulum)
+    bobotnya bergantung N, jadi dilewati.
+    """
+    for m in range(n - 1, n_min - 1, -1):
+        path = model_path_for(m)
+        if os.path.exists(path + ".zip") and _is_tree_set_model(path):
+            return path
+    return None
+
+def train_curriculum(puzzles, make_env, model_path_for, first_timesteps, step_timesteps,
+                     callback_for=None, checkpoint_dir_for=None, **ppo_kwargs):
+    """
+    Latih TreeSetPolicy dengan kurikulum N yang naik.
+
+    Puzzle pertama dilatih dari nol selama first_timesteps; setiap N berikutnya
+    di-warm-start dari checkpoint N terdekat yang lebih kecil dan hanya dilatih
+    step_timesteps tambahan. Model yang sudah ada dilewati (bisa di-resume).
+
+    make_env(n) -> env, model_path_for(n) -> path tanpa .zip,
+    callback_for(n) -> callback SB3 opsional.
+    checkpoint_dir_for(n) -> folder checkpoint opsional: jika berisi checkpoint
+    "latest" dari run yang terputus, training N itu dilanjutkan dari sana.
+    """
+    for n in sorted(puzzles):
+        path = model_path_for(n)
+        if os.path.exists(path + ".zip"):
+            print(f"Kurikulum: model N={n} sudah ada, lewati.")
+            continue
+
+        warm_path = _nearest_smaller_model(n, model_path_for)
+        timesteps = first_timesteps if warm_path is None else step_timesteps
+        resume_path = latest_checkpoint(checkpoint_dir_for(n)) if checkpoint_dir_for else None
+        env = make_env(n)
+        # Bobot, state optimizer dan num_timesteps dari checkpoint terakhir (jika space-nya cocok)
+        model = load_compatible(PPO, resume_path, env) if resume_path is not None else None
+        if model is not None:
+            print(f"Kurikulum: N={n} resume dari langkah {model.num_timesteps}")
+        else:
+            model = PPO(TreeSetPolicy, env, **ppo_kwargs)
+            if warm_path is not None:
+                # Bobot TreeSetPolicy tidak bergantung N, jadi bisa langsung dimuat
+                model.set_parameters(warm_path, exact_match=True, device=model.device)
+                print(f"Kurikulum: N={n} warm start dari {os.path.basename(warm_path)}")
+
+        start_time = time.time()
+        callback = callback_for(n) if callback_for else None
+        model.learn(total_timesteps=max(timesteps - model.num_timesteps, 0), callback=callback,
+                    reset_num_timesteps=False)
+        print(f"Kurikulum: N={n} selesai {timesteps} langkah dalam {time.time() - start_time:.2f} detik.")
+        model.save(path)
@@ -1,15 +1,54 @@
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
-from .geometry import create_polys_from_state
+from .collision import total_overlap_area
+from .geometry import TREE_VERTICES, TREE_HULL, polys_from_vertices
+from .penetration import PIECE_VERTICES, PIECE_NORMALS, SatScratch, piece_pair_depths
+from .reward import RewardShaper, StepGeometry
+from . import instrument
 
 class ChristmasTreeEnv(gym.Env):
-    def __init__(self, n_trees=5):
+    """
+    reward_mode:
+      "exact" -> penalti luas irisan Shapely (default)
+      "fast"  -> proxy murah: kedalaman penetrasi SAT^2, murni NumPy
+
+    initial_state: layout awal (flat N*3, mis. dari src.seeding.seed_state) yang
+    dipakai reset() sebagai ganti tumpukan acak; init_noise menambahkan noise
+    Gaussian (dalam satuan skala gerakan) agar tiap episode sedikit berbeda.
+    Keduanya bisa di-override per episode lewat reset(options={...}).
+
+    reward_terms: dict {term: bobot} untuk RewardShaper (lihat src.reward), mis.
+    {"area": 1.0, "overlap": 10000.0} (default, sama dengan reward lama) atau
+    {"delta_side": 10.0, "overlap": 100.0, "pair_distance": 0.01}.
+    max_episode_steps: episode di-truncate setelah sekian step (None = tanpa batas).
+
+    Observasi yang dikembalikan adalah buffer state internal yang diperbarui
+    in place di setiap step; salin (copy) jika perlu menyimpan state lama.
+    """
+    def __init__(self, n_trees=5, reward_mode="exact", initial_state=None, init_noise=0.0,
+                 reward_terms=None, max_episode_steps=None):
         super(ChristmasTreeEnv, self).__init__()
         self.n_trees = n_trees
+        self.reward_mode = reward_mode
+        self.initial_state = initial_state
+        self.init_noise = init_noise
+        self.max_episode_steps = max_episode_steps
+        self.episode_steps = 0
         
         # Batas koordinat area kerja
         self.limit = 20.0
+        # Batas rotasi: tidak dibungkus modulo 360 (input MLP tetap kontinu di 0/360),
+        # cukup lebar agar setiap orientasi bisa dicapai dari kedua arah
+        self.rot_limit = 360.0
+
+        # Skala gerakan
+        self.move_scale = 0.2   # Maks geser 0.2 unit
+        self.rot_scale = 5.0    # Maks putar 5 derajat
+        self.penalty_weight = 10000.0  # Bobot penalti overlap
+        self.reward = RewardShaper(
+            {"area": 1.0, "overlap": self.penalty_weight} if reward_terms is None else reward_terms
+        )
         
         # ACTION SPACE: Perubahan posisi [dx, dy, d_theta] untuk setiap pohon
         # Nilai continuous antara -1 sampai 1
@@ -19,68 +58,203 @@ class ChristmasTreeEnv(gym.Env):
             dtype=np.float32
         )
         
-        # OBSERVATION SPACE: Posisi absolut [x, y, theta]
+        # OBSERVATION SPACE: Posisi absolut [x, y, theta]; x, y dalam +-limit, theta dalam +-rot_limit
         self.observation_space = spaces.Box(
-            low=-self.limit, high=self.limit,
-            shape=(n_trees * 3,), 
+            low=np.tile(np.array([-self.limit, -self.limit, -self.rot_limit], dtype=np.float32), n_trees),
+            high=np.tile(np.array([self.limit, self.limit, self.rot_limit], dtype=np.float32), n_trees),
             dtype=np.float32
         )
         
         self.state = None
 
+        # --- BUFFER PRA-ALOKASI (hot path step tanpa alokasi baru) ---
+        self.scale_vec = np.tile(
+            np.array([self.move_scale, self.move_scale, self.rot_scale], dtype=np.float32),
+            n_trees
+        )
+        self._state_buf = np.zeros(n_trees * 3, dtype=np.float32)
+        self._xy = self._state_buf.reshape(n_trees, 3)[:, :2]   # View posisi
+        self._deg = self._state_buf.reshape(n_trees, 3)[:, 2]   # View rotasi
+        self._delta = np.empty(n_trees * 3, dtype=np.float32)
+        self._rad = np.empty((n_trees, 1))
+        self._cos = np.empty((n_trees, 1))
+        self._sin = np.empty((n_trees, 1))
+        self._tmp = np.empty((n_trees, len(TREE_VERTICES)))
+        self._verts = np.empty((n_trees, len(TREE_VERTICES), 2))
+        # Mode "fast" hanya butuh extent: cukup 5 verteks convex hull
+        self._hull_tmp = np.empty((n_trees, len(TREE_HULL)))
+        self._hull = np.empty((n_trees, len(TREE_HULL), 2))
+        self._mins = np.empty(2)
+        self._maxs = np.empty(2)
+        if reward_mode == "fast":
+            self._init_fast_buffers()
+        # Geometri step (side/overlap lazy) dipakai bersama semua term reward
+        self._geom = StepGeometry(self._xy, self._side, self._overlap)
+
+    def _init_fast_buffers(self):
+        """
+        Scratch mode "fast": potongan konveks (N, 16, 2), AABB potongan & pohon,
+        matriks uji AABB semua pasangan (N, N) dan buffer kerja narrow phase SAT.
+        Semua dipakai ulang setiap step; yang masih dialokasikan hanya array indeks
+        pasangan kandidat (kecil, ~O(N)) dan buffer iterasi internal NumPy untuk
+        operasi broadcast (dibatasi ukuran buffer ufunc, tidak tumbuh dengan N).
+        """
+        n = self.n_trees
+        self._piece_pts = PIECE_VERTICES.reshape(16, 2)
+        self._piece_nrm = PIECE_NORMALS.reshape(16, 2)
+        self._piece_tmp = np.empty((n, 16))
+        self._pv = np.empty((n, 16, 2))
+        self._pn = np.empty((n, 16, 2))
+        self._piece_lo = np.empty((n, 4, 2))
+        self._piece_hi = np.empty((n, 4, 2))
+        self._tree_lo = np.empty((n, 2))
+        self._tree_hi = np.empty((n, 2))
+        self._pair_hit = np.empty((n, n), dtype=bool)
+        self._pair_tmp = np.empty((n, n), dtype=bool)
+        self._upper = np.triu(np.ones((n, n), dtype=bool), 1)
+        self._sat = SatScratch()
+
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
-        # Inisialisasi posisi acak tapi rapat di tengah
-        self.state = np.random.uniform(-2, 2, size=(self.n_trees * 3)).astype(np.float32)
+        options = options or {}
+        initial_state = options.get("initial_state", self.initial_state)
+        init_noise = options.get("init_noise", self.init_noise)
+
+        if initial_state is None:
+            # Inisialisasi posisi acak tapi rapat di tengah
+            self._state_buf[:] = np.random.uniform(-2, 2, size=(self.n_trees * 3))
+        else:
+            # Warm start dari seed (lattice / solusi N-1, N+1)
+            self._state_buf[:] = initial_state
+            if init_noise:
+                self._state_buf += np.random.normal(0, init_noise, size=self.n_trees * 3) * self.scale_vec
+            # Orientasi seed (boleh sudut berapa pun) dinormalkan ke [-90, 270): jauh dari
+            # batas clip, dan sudut umum 0 / 180 tidak jatuh di sambungan wrap
+            self._deg += 90.0
+            np.mod(self._deg, 360.0, out=self._deg)
+            self._deg -= 90.0
+        self._bound_state()
+        self.state = self._state_buf
+        self.episode_steps = 0
+        self.reward.reset()
         return self.state, {}
 
+    def _bound_state(self):
+        """Clip x, y ke +-limit dan rotasi ke +-rot_limit, in place."""
+        np.clip(self._xy, -self.limit, self.limit, out=self._xy)
+        np.clip(self._deg, -self.rot_limit, self.rot_limit, out=self._deg)
+
+    def _transform(self, points, tmp, out, translate=True):
+        """
+        Titik pohon (K, 2) diputar & digeser untuk semua pohon ke buffer out (N, K, 2).
+        translate=False: hanya rotasi (untuk vektor normal).
+        """
+        s = self.state.reshape(self.n_trees, 3)
+        px, py = points[:, 0], points[:, 1]
+        self._rad[:] = s[:, 2:3]  # float64 agar presisi sama dengan state_to_vertices
+        np.deg2rad(self._rad, out=self._rad)
+        np.cos(self._rad, out=self._cos)
+        np.sin(self._rad, out=self._sin)
+
+        # Rotasi dulu, baru translasi (geser)
+        vx, vy = out[..., 0], out[..., 1]
+        np.multiply(px, self._cos, out=vx)
+        np.multiply(py, self._sin, out=tmp)
+        vx -= tmp
+        np.multiply(px, self._sin, out=vy)
+        np.multiply(py, self._cos, out=tmp)
+        vy += tmp
+        if translate:
+            vx += s[:, 0:1]
+            vy += s[:, 1:2]
+        return out
+
+    def _update_vertices(self):
+        """Tensor verteks (N, 15, 2) dihitung ke buffer yang sama setiap step."""
+        return self._transform(TREE_VERTICES, self._tmp, self._verts)
+
+    def _update_hull(self):
+        """Verteks convex hull (N, 5, 2): extent-nya sama persis dengan poligon penuh."""
+        return self._transform(TREE_HULL, self._hull_tmp, self._hull)
+
     def step(self, action):
-        # Skala gerakan
-        move_scale = 0.2   # Maks geser 0.2 unit
-        rot_scale = 5.0    # Maks putar 5 derajat
-        
-        # Terapkan aksi
-        scale_vec = np.tile([move_scale, move_scale, rot_scale], self.n_trees)
-        self.state += action * scale_vec
+        instrument.count("env.steps")
+        # Terapkan aksi (in place, vektor skala sudah dihitung di __init__)
+        np.multiply(action, self.scale_vec, out=self._delta)
+        self.state += self._delta
         
-        # Clip agar tidak keluar batas dunia
-        self.state = np.clip(self.state, -self.limit, self.limit)
+        # Clip posisi agar tidak keluar batas dunia, rotasi ke +-rot_limit
+        self._bound_state()
         
+        self.episode_steps += 1
+
         # --- HITUNG REWARD ---
-        polys = create_polys_from_state(self.state, self.n_trees)
-        
-        # Bounding Box (Area)
-        min_x = min(p.bounds[0] for p in polys)
-        min_y = min(p.bounds[1] for p in polys)
-        max_x = max(p.bounds[2] for p in polys)
-        max_y = max(p.bounds[3] for p in polys)
-        
-        width = max_x - min_x
-        height = max_y - min_y
-        side = max(width, height)
-        area_score = side ** 2
-        
-        # Overlap (Hukuman Tabrakan)
-        overlap_area = 0.0
-        # Cek setiap pasangan pohon
-        for i in range(len(polys)):
-            for j in range(i + 1, len(polys)):
-                if polys[i].intersects(polys[j]):
-                    inter = polys[i].intersection(polys[j]).area
-                    overlap_area += inter
-
-        # Rumus Reward:
-        penalty_weight = 10000.0  # Bobot penalti overlap 
-        
-        reward = -area_score - (overlap_area * penalty_weight)
-        
+        # Geometri step ini dihitung lazy & sekali saja, dipakai bersama semua term reward
+        geom = self._geom
+        geom.clear()
+        reward = float(self.reward(geom))
+
         terminated = False
-        truncated = False
-        
+        truncated = self.max_episode_steps is not None and self.episode_steps >= self.max_episode_steps
+
+        side = float(geom.side)
         info = {
             "side": side,
-            "score": area_score,
-            "overlap": overlap_area
+            "score": side ** 2,
+            "overlap": geom.overlap
         }
         
-        return self.state, reward, terminated, truncated, info
\ No newline at end of file
+        return self.state, reward, terminated, truncated, info
+
+    def _side(self):
+        """Sisi bounding square dari verteks convex hull (extent sama dengan poligon penuh)."""
+        verts = self._update_hull()
+        np.min(verts, axis=(0, 1), out=self._mins)
+        np.max(verts, axis=(0, 1), out=self._maxs)
+        return float(max(self._maxs[0] - self._mins[0], self._maxs[1] - self._mins[1]))
+
+    def _overlap(self):
+        """Hukuman tabrakan sesuai reward_mode."""
+        if self.reward_mode == "fast":
+            # Proxy murah: kedalaman penetrasi SAT, tanpa objek Shapely
+            return self._fast_overlap()
+        # Broad phase STRtree: hanya pasangan yang bersinggungan dihitung exact
+        return total_overlap_area(polys_from_vertices(self._update_vertices()))
+
+    def _fast_overlap(self):
+        """
+        Sama dengan penetration.overlap_penalty (jumlah kedalaman^2 SAT antar
+        potongan), tapi broad phase memakai buffer pra-alokasi.
+        """
+        n = self.n_trees
+        pv = self._transform(self._piece_pts, self._piece_tmp, self._pv).reshape(n, 4, 4, 2)
+        pn = self._transform(self._piece_nrm, self._piece_tmp, self._pn, translate=False).reshape(n, 4, 4, 2)
+        # AABB potongan & pohon; minimum berpasangan jauh lebih cepat dari reduksi sumbu 4
+        lo, hi = self._piece_lo, self._piece_hi
+        np.minimum(pv[:, :, 0], pv[:, :, 1], out=lo)
+        np.maximum(pv[:, :, 0], pv[:, :, 1], out=hi)
+        for k in (2, 3):
+            np.minimum(lo, pv[:, :, k], out=lo)
+            np.maximum(hi, pv[:, :, k], out=hi)
+        np.minimum(lo[:, 0], lo[:, 1], out=self._tree_lo)
+        np.maximum(hi[:, 0], hi[:, 1], out=self._tree_hi)
+        for k in (2, 3):
+            np.minimum(self._tree_lo, lo[:, k], out=self._tree_lo)
+            np.maximum(self._tree_hi, hi[:, k], out=self._tree_hi)
+
+        # Uji AABB semua pasangan pohon (i < j) di matriks (N, N) yang dipakai ulang
+        tlo, thi, hit, tmp = self._tree_lo, self._tree_hi, self._pair_hit, self._pair_tmp
+        np.less_equal(tlo[:, None, 0], thi[None, :, 0], out=hit)
+        hit &= self._upper
+        np.greater_equal(thi[:, None, 0], tlo[None, :, 0], out=tmp)
+        hit &= tmp
+        np.less_equal(tlo[:, None, 1], thi[None, :, 1], out=tmp)
+        hit &= tmp
+        np.greater_equal(thi[:, None, 1], tlo[None, :, 1], out=tmp)
+        hit &= tmp
+        i, j = np.nonzero(hit)
+        instrument.count("sat.pairs_checked", len(i))
+        if len(i) == 0:
+            return 0.0
+        _, d = piece_pair_depths(pv, pn, i, j, boxes=(lo, hi), scratch=self._sat)
+        return float(np.dot(d, d))
@@ -1,10 +1,11 @@
-from shapely.geometry import Polygon
-from shapely import affinity
 import numpy as np
 
-def get_tree_polygon():
+# Shapely hanya di-import di fungsi yang membuat Polygon: fungsi geometri lain
+# (verteks, AABB, sisi layout) cukup NumPy sehingga scoring/resume tetap ringan
+
+def _tree_coords():
     """
-    Mendefinisikan bentuk poligon pohon standar sesuai spesifikasi kompetisi.
+    Koordinat 15 titik poligon pohon standar sesuai spesifikasi kompetisi.
     """
     # Dimensi pohon
     trunk_w, trunk_h = 0.15, 0.2
@@ -13,34 +14,122 @@ def get_tree_polygon():
     trunk_bottom_y = -trunk_h
 
     # Koordinat titik-titik poligon
-    coords = [
-        (0.0, tip_y), 
+    return [
+        (0.0, tip_y),
         (top_w/2, tier_1_y), (top_w/4, tier_1_y),
-        (mid_w/2, tier_2_y), (mid_w/4, tier_2_y), 
+        (mid_w/2, tier_2_y), (mid_w/4, tier_2_y),
         (base_w/2, base_y),
         (trunk_w/2, base_y), (trunk_w/2, trunk_bottom_y),
         (-trunk_w/2, trunk_bottom_y), (-trunk_w/2, base_y),
-        (-base_w/2, base_y), 
+        (-base_w/2, base_y),
         (-mid_w/4, tier_2_y), (-mid_w/2, tier_2_y),
         (-top_w/4, tier_1_y), (-top_w/2, tier_1_y)
     ]
-    return Polygon(coords)
+
+# Verteks pohon (15, 2) dihitung sekali saja, dipakai ulang oleh semua fungsi batch
+TREE_VERTICES = np.array(_tree_coords(), dtype=np.float64)
+TREE_VERTICES.setflags(write=False)
+
+# Convex hull pohon (CCW): puncak, sudut alas kiri, dua sudut bawah batang, sudut alas kanan.
+# Titik-titik tier lain ada di dalam hull, jadi extent pohon yang diputar hanya
+# ditentukan oleh 5 titik ini (fungsi support: max proyeksi atas verteks hull).
+TREE_HULL = np.array(
+    [(0.0, 0.8), (-0.35, 0.0), (-0.075, -0.2), (0.075, -0.2), (0.35, 0.0)], dtype=np.float64
+)
+TREE_HULL.setflags(write=False)
+
+def get_tree_polygon():
+    """
+    Mendefinisikan bentuk poligon pohon standar sesuai spesifikasi kompetisi.
+    """
+    from shapely.geometry import Polygon
+    return Polygon(_tree_coords())
+
+def state_to_vertices(state, n_trees=None):
+    """
+    Mengubah state [x1, y1, deg1, x2, y2, deg2, ...] menjadi tensor verteks.
+    Rotasi dan translasi semua pohon dilakukan dengan satu operasi broadcast.
+
+    state boleh berdimensi batch: (..., N*3) -> (..., N, 15, 2).
+    """
+    s = np.asarray(state, dtype=np.float64)
+    if n_trees is not None:
+        s = s[..., :n_trees * 3]
+    s = s.reshape(s.shape[:-1] + (-1, 3))
+
+    rad = np.deg2rad(s[..., 2:3])
+    cos_t, sin_t = np.cos(rad), np.sin(rad)
+    px, py = TREE_VERTICES[:, 0], TREE_VERTICES[:, 1]
+
+    # Rotasi dulu (terhadap origin), baru translasi (geser)
+    verts = np.empty(s.shape[:-1] + (len(TREE_VERTICES), 2))
+    verts[..., 0] = px * cos_t - py * sin_t + s[..., 0:1]
+    verts[..., 1] = px * sin_t + py * cos_t + s[..., 1:2]
+    return verts
+
+def layout_bounds(vertices):
+    """
+    Bounding box seluruh layout langsung dari tensor verteks.
+    (..., N, 15, 2) -> (..., 4) berisi [min_x, min_y, max_x, max_y].
+    """
+    mins = vertices.min(axis=(-3, -2))
+    maxs = vertices.max(axis=(-3, -2))
+    return np.concatenate([mins, maxs], axis=-1)
+
+def bounding_square_side(vertices):
+    """
+    Sisi kotak pembungkus (bounding square) dari tensor verteks (..., N, 15, 2).
+    """
+    b = layout_bounds(vertices)
+    return np.maximum(b[..., 2] - b[..., 0], b[..., 3] - b[..., 1])
+
+def rotated_extents(deg):
+    """
+    Extent pohon yang diputar deg derajat, relatif terhadap titik (x, y) pohon.
+    (...,) -> (..., 4) berisi [min_x, min_y, max_x, max_y]; exact (closed form),
+    hanya 5 verteks hull yang diproyeksikan, tanpa Shapely.
+    """
+    rad = np.deg2rad(np.asarray(deg, dtype=np.float64))[..., None]
+    cos_t, sin_t = np.cos(rad), np.sin(rad)
+    px, py = TREE_HULL[:, 0], TREE_HULL[:, 1]
+    hx = px * cos_t - py * sin_t
+    hy = px * sin_t + py * cos_t
+    return np.stack([hx.min(-1), hy.min(-1), hx.max(-1), hy.max(-1)], axis=-1)
+
+def tree_boxes(state, n_trees=None):
+    """
+    AABB tiap pohon langsung dari state lewat rotated_extents.
+    (..., N*3) -> (..., N, 4); sama dengan aabb_from_vertices(state_to_vertices(state)).
+    """
+    s = np.asarray(state, dtype=np.float64)
+    if n_trees is not None:
+        s = s[..., :n_trees * 3]
+    s = s.reshape(s.shape[:-1] + (-1, 3))
+    ext = rotated_extents(s[..., 2])
+    ext[..., 0::2] += s[..., 0:1]
+    ext[..., 1::2] += s[..., 1:2]
+    return ext
+
+def layout_side(state, n_trees=None):
+    """
+    Sisi bounding square layout langsung dari state (..., N*3) -> (...).
+    Versi cepat dari bounding_square_side(state_to_vertices(state)).
+    """
+    b = tree_boxes(state, n_trees)
+    mins = b[..., :2].min(axis=-2)
+    maxs = b[..., 2:].max(axis=-2)
+    return np.max(maxs - mins, axis=-1)
+
+def polys_from_vertices(vertices):
+    """
+    Membuat array Polygon Shapely dari tensor verteks (N, 15, 2) dalam satu panggilan.
+    """
+    import shapely
+    return shapely.polygons(vertices)
 
 def create_polys_from_state(state, n_trees):
     """
     Mengubah array 1D (flat) menjadi list objek Polygon Shapely.
     State format: [x1, y1, deg1, x2, y2, deg2, ...]
     """
-    base_poly = get_tree_polygon()
-    polys = []
-    for i in range(n_trees):
-        idx = i * 3
-        x = state[idx]
-        y = state[idx+1]
-        deg = state[idx+2]
-        
-        # Rotasi dulu, baru translasi (geser)
-        p = affinity.rotate(base_poly, deg, origin=(0,0))
-        p = affinity.translate(p, x, y)
-        polys.append(p)
-    return polys
\ No newline at end of file
+    return list(polys_from_vertices(state_to_vertices(state, n_trees)))
@@ -0,0 +1,86 @@
+import os
+import json
+import time
+import functools
+from collections import defaultdict
+
+# Instrumentasi ringan per proses: counter dan timer global yang bisa dimatikan.
+# Saat nonaktif, count() dan timer() hanya satu cek boolean (nyaris gratis di hot path).
+_enabled = False
+counters = defaultdict(int)
+timers = defaultdict(float)
+
+def enable(flag=True):
+    """Aktifkan/nonaktifkan pencatatan counter dan timer di proses ini."""
+    global _enabled
+    _enabled = bool(flag)
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    """Kosongkan semua counter dan timer (mis. di awal setiap puzzle)."""
+    counters.clear()
+    timers.clear()
+
+def count(name, value=1):
+    """Tambah counter `name` sebanyak value."""
+    if _enabled:
+        counters[name] += value
+
+class timer:
+    """
+    Context manager pengukur waktu kumulatif: `with timer("shapely"): ...`.
+    Nama berawalan "phase." dipakai untuk wall time per fase pipeline.
+    """
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if _enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            timers[self.name] += time.perf_counter() - self.start
+            self.start = None
+        return False
+
+def timed(name):
+    """Decorator: seluruh waktu eksekusi fungsi masuk ke timer `name`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with timer(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def phase(name):
+    """Timer untuk satu fase pipeline (train / rollout / squeeze / save ...)."""
+    return timer(f"phase.{name}")
+
+def snapshot():
+    """Salinan counter dan timer saat ini, dengan fase dipisah tersendiri."""
+    phases = {k[len("phase."):]: v for k, v in timers.items() if k.startswith("phase.")}
+    other = {k: v for k, v in timers.items() if not k.startswith("phase.")}
+    return {"counters": dict(counters), "timers": other, "phases": phases}
+
+def write_record(path, **fields):
+    """
+    Tambahkan satu record JSON (satu baris) ke file JSONL: fields + snapshot().
+    Satu write() per record dalam mode append, jadi aman dipakai banyak worker.
+    """
+    record = {"timestamp": time.time(), "pid": os.getpid()}
+    record.update(fields)
+    record.update(snapshot())
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(record, default=float) + "\n")
+    return record
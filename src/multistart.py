@@ -0,0 +1,121 @@
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.optimize import minimize
+from .optimizer import objective_cache, _separate
+from . import instrument
+from .geometry import layout_side
+from .penetration import has_overlap
+from .symmetry import dedupe_states
+
+def collect_rollout_starts(model, env, n_starts, n_steps=50):
+    """
+    Kumpulkan beberapa titik awal dari policy RL. Rollout pertama
+    deterministik, sisanya stokastik agar titik awalnya beragam.
+    Return: list (state, score) dengan state berupa salinan observasi akhir.
+    """
+    starts = []
+    for k in range(n_starts):
+        obs, _ = env.reset()
+        info = {}
+        for _ in range(n_steps):
+            action, _states = model.predict(obs, deterministic=(k == 0))
+            obs, rewards, dones, truncated, info = env.step(action)
+        # Observasi env adalah buffer yang di-update in place, jadi harus disalin
+        starts.append((np.array(obs, dtype=np.float64), info.get('score', 0.0)))
+    return starts
+
+def _squeeze_chunk(args):
+    """
+    Lanjutkan Nelder-Mead dari simplex terakhir sebanyak maxiter iterasi.
+    Return: (x, simplex, cost, converged).
+    """
+    x, simplex, n_trees, maxiter = args
+    options = {'maxiter': maxiter, 'disp': False}
+    if simplex is not None:
+        options['initial_simplex'] = simplex
+    result = minimize(objective_cache, x, args=(n_trees, None), method='Nelder-Mead', options=options)
+    converged = result.status == 0
+    instrument.count("optimizer.iterations", result.nit)
+    return result.x, result.final_simplex[0], float(result.fun), converged
+
+def multi_start_squeeze(starts, n_trees, time_budget, keep_fraction=0.5, chunk_iter=500,
+                        n_workers=1):
+    """
+    Squeeze banyak titik awal dengan anggaran waktu bersama (detik).
+
+    Successive halving: setiap ronde semua kandidat yang masih hidup
+    mendapat chunk_iter iterasi Nelder-Mead (melanjutkan simplex masing-masing),
+    lalu hanya `keep_fraction` terbaik (berdasarkan cost) yang dipertahankan.
+    Sisa anggaran dipakai untuk memperhalus kandidat terbaik.
+
+    Titik awal (dan kandidat setelah tiap ronde) yang sama hingga simetri
+    (translasi, rotasi 90 deg, cermin, permutasi) hanya dikerjakan sekali.
+    Cost dievaluasi lewat objective_cache (cache per proses worker).
+
+    Cost berpenalti masih menyisakan overlap kecil, jadi hasil terbaik
+    dipisahkan dengan _separate lalu divalidasi, seperti gradient_squeeze /
+    boundary_squeeze. Jika tetap overlap, dikembalikan titik awal valid dengan
+    sisi terkecil (mis. seed), sehingga hasilnya tidak pernah lebih buruk dari input.
+
+    Return: (final_side, final_coords) seperti squeeze_solution.
+    """
+    deadline = time.time() + time_budget
+    starts = [np.asarray(x, dtype=np.float64) for x in starts]
+    candidates = [(starts[k], None) for k in dedupe_states(starts, n_trees)]
+    if len(candidates) < len(starts):
+        print(f"   Multi-start: {len(starts) - len(candidates)} titik awal duplikat dibuang")
+    best = None   # (cost, x, simplex, converged)
+
+    pool = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+    run = pool.map if pool else map
+    try:
+        round_time = 0.0
+        while candidates and time.time() + round_time < deadline:
+            round_start = time.time()
+            results = list(run(_squeeze_chunk, [(x, s, n_trees, chunk_iter) for x, s in candidates]))
+            round_time = time.time() - round_start
+
+            ranked = sorted(results, key=lambda r: r[2])
+            if best is None or ranked[0][2] < best[0]:
+                best = (ranked[0][2], ranked[0][0], ranked[0][1], ranked[0][3])
+
+            if len(ranked) == 1:
+                break
+            # Kandidat yang konvergen ke basin yang sama cukup disimpan satu
+            ranked = [ranked[k] for k in dedupe_states([r[0] for r in ranked], n_trees)]
+            # Pangkas titik awal yang tidak menjanjikan
+            keep = max(1, math.ceil(len(ranked) * keep_fraction))
+            candidates = [(x, s) for x, s, _, _ in ranked[:keep]]
+            print(f"   Multi-start: {len(ranked)} -> {keep} kandidat, cost terbaik {best[0]:.6f}")
+    finally:
+        if pool:
+            pool.shutdown()
+
+    if best is None:
+        x = np.asarray(starts[0], dtype=np.float64)
+        best = (objective_cache(x, n_trees, None), x, None, False)
+
+    # Perhalus kandidat terbaik sampai konvergen atau anggaran habis
+    cost, x, simplex, converged = best
+    chunk_time = 0.0
+    while not converged and time.time() + chunk_time < deadline:
+        chunk_start = time.time()
+        x, simplex, cost, converged = _squeeze_chunk((x, simplex, n_trees, chunk_iter))
+        chunk_time = time.time() - chunk_start
+
+    stats = objective_cache.stats()
+    print(f"   Cache cost: {stats['hits']} hit / {stats['misses']} miss ({stats['hit_rate']:.1%})")
+
+    # Sisa penetrasi dari penalti dibersihkan; hasil harus bebas overlap
+    x = _separate(x, n_trees)
+    if has_overlap(x, n_trees):
+        valid = [s for s in starts if not has_overlap(s, n_trees)]
+        if valid:
+            print("   Multi-start: hasil masih overlap, kembali ke titik awal valid terbaik")
+            x = min(valid, key=lambda s: layout_side(s, n_trees))[:n_trees * 3].copy()
+        else:
+            print("   Multi-start: PERINGATAN tidak ada layout bebas overlap")
+    final_side = float(layout_side(x, n_trees))
+    return final_side, x
@@ -1,24 +1,50 @@
 import numpy as np
 from scipy.optimize import minimize
-from shapely import affinity
+import heapq
 import math
-from .geometry import get_tree_polygon
+import time
+import shapely
+from .collision import (
+    total_overlap_area,
+    overlap_pairs,
+    aabb_from_vertices,
+    batch_candidate_pairs,
+    boundary_trees,
+    active_trees,
+)
+from .geometry import (
+    get_tree_polygon,
+    state_to_vertices,
+    bounding_square_side,
+    layout_side,
+    polys_from_vertices,
+)
+from .penetration import (
+    overlap_penalty,
+    overlap_penalty_and_grad,
+    has_overlap,
+    DEPTH_PENALTY_WEIGHT,
+)
+from .seeding import seed_state
+from .cache import CostCache
+from .config import SQUEEZE_TIME_BUDGET
+from . import instrument
+
+# Penalti harus SANGAT BESAR agar optimizer takut overlap
+PENALTY_WEIGHT = 1_000_000.0
+
+# Jadwal annealing squeezer gradien: soft-max makin tajam, penalti makin berat
+SOFTMAX_BETAS = (10.0, 30.0, 100.0, 300.0, 1000.0)
+DEPTH_WEIGHTS = (1e1, 1e2, 1e3, 1e4, 1e5)
 
 # Perlu fungsi helper untuk mengubah state ke polygon di optimizer
-def create_polys_from_state_local(flat_state, n_trees, base_poly):
-    """Mengubah state array 1D menjadi list of Polygons untuk Shapely."""
-    polys = []
+def create_polys_from_state_local(flat_state, n_trees, base_poly=None):
+    """
+    Mengubah state array 1D menjadi list of Polygons untuk Shapely.
+    base_poly dipertahankan demi kompatibilitas; verteks pohon sudah di-cache di geometry.
+    """
     # flat_state format: [x1, y1, deg1, x2, y2, deg2, ...]
-    for i in range(n_trees):
-        idx = i * 3
-        x = flat_state[idx]
-        y = flat_state[idx+1]
-        deg = flat_state[idx+2]
-        
-        p = affinity.rotate(base_poly, deg, origin=(0,0))
-        p = affinity.translate(p, x, y)
-        polys.append(p)
-    return polys
+    return list(polys_from_vertices(state_to_vertices(flat_state, n_trees)))
 
 def objective_function(flat_params, n_trees, base_poly):
     """
@@ -27,62 +53,444 @@ def objective_function(flat_params, n_trees, base_poly):
     flat_params sekarang hanya berisi koordinat dan rotasi [x1, y1, d1, x2, y2, d2, ...]
     """
     
-    # --- Hitung Polygons dan Overlap ---
-    polys = create_polys_from_state_local(flat_params, n_trees, base_poly)
-    
-    overlap_area = 0.0
-    for i in range(n_trees):
-        for j in range(i + 1, n_trees):
-            if polys[i].intersects(polys[j]):
-                overlap_area += polys[i].intersection(polys[j]).area
+    instrument.count("cost.calls")
+
+    # --- Hitung Verteks, Polygons dan Overlap ---
+    verts = state_to_vertices(flat_params, n_trees)
+    polys = polys_from_vertices(verts)
     
-    # --- Hitung Bounding Box  ---
-    min_x = min(p.bounds[0] for p in polys)
-    min_y = min(p.bounds[1] for p in polys)
-    max_x = max(p.bounds[2] for p in polys)
-    max_y = max(p.bounds[3] for p in polys)
+    overlap_area = total_overlap_area(polys)
     
-    side = max(max_x - min_x, max_y - min_y)
+    # --- Hitung Bounding Box (langsung dari tensor verteks) ---
+    side = float(bounding_square_side(verts))
     calculated_area = side ** 2
     
     # --- Hitung Total (Cost) ---
-    # Penalti harus SANGAT BESAR agar optimizer takut overlap
-    PENALTY_WEIGHT = 1_000_000.0 
-    
     # Tujuan kita adalah meminimalkan area yang Dihitung, ditambah penalti
     cost = calculated_area + (overlap_area * PENALTY_WEIGHT)
     
     return cost
 
-def squeeze_solution(initial_state, n_trees):
+def depth_objective_function(flat_params, n_trees, base_poly=None):
+    """
+    Varian objective_function dengan penalti kedalaman penetrasi (SAT konveks).
+    Penalti halus dan tidak datar selama pohon masih tumpang tindih,
+    sehingga bobotnya tidak perlu sebesar PENALTY_WEIGHT.
+    """
+    instrument.count("cost.calls")
+    side = float(layout_side(flat_params, n_trees))
+    return side ** 2 + overlap_penalty(flat_params, n_trees) * DEPTH_PENALTY_WEIGHT
+
+# Cache LRU per proses dengan key kanonik (translasi / rotasi 90 / cermin / permutasi):
+# simplex Nelder-Mead dan multi-start sering mengevaluasi ulang layout yang sama.
+# Statistik: objective_cache.stats() dan counter instrumentasi cache.hits / cache.misses.
+objective_cache = CostCache(objective_function)
+depth_objective_cache = CostCache(depth_objective_function)
+
+def _soft_max(values, beta):
+    """Log-sum-exp: aproksimasi halus max(values) beserta bobot softmax-nya."""
+    top = values.max()
+    e = np.exp(beta * (values - top))
+    z = e.sum()
+    return top + np.log(z) / beta, e / z
+
+def soft_side_and_grad(flat_params, n_trees, beta):
+    """
+    Sisi bounding square versi halus (soft-max atas semua verteks) dan gradiennya.
+    Nilainya selalu >= sisi sebenarnya dan mendekatinya saat beta membesar.
+    """
+    s = np.asarray(flat_params, dtype=np.float64)[:n_trees * 3].reshape(n_trees, 3)
+    verts = state_to_vertices(s.ravel())
+    x, y = verts[..., 0].ravel(), verts[..., 1].ravel()
+
+    max_x, w_max_x = _soft_max(x, beta)
+    neg_min_x, w_min_x = _soft_max(-x, beta)
+    max_y, w_max_y = _soft_max(y, beta)
+    neg_min_y, w_min_y = _soft_max(-y, beta)
+
+    width = max_x + neg_min_x
+    height = max_y + neg_min_y
+    side, (w_w, w_h) = _soft_max(np.array([width, height]), beta)
+
+    # Turunan sisi terhadap setiap verteks, lalu rantai ke (x, y, deg)
+    gx = (w_w * (w_max_x - w_min_x)).reshape(n_trees, -1)
+    gy = (w_h * (w_max_y - w_min_y)).reshape(n_trees, -1)
+    rx = verts[..., 0] - s[:, 0:1]
+    ry = verts[..., 1] - s[:, 1:2]
+
+    grad = np.empty((n_trees, 3))
+    grad[:, 0] = gx.sum(axis=1)
+    grad[:, 1] = gy.sum(axis=1)
+    grad[:, 2] = (np.pi / 180.0) * (gx * -ry + gy * rx).sum(axis=1)
+    return side, grad.ravel()
+
+def smooth_objective_and_grad(flat_params, n_trees, beta, weight):
+    """
+    Surrogate halus untuk squeezer gradien: soft_side^2 + weight * sum(kedalaman^2).
+    Return (cost, jac) sesuai konvensi jac=True pada scipy.optimize.minimize.
+    """
+    side, side_grad = soft_side_and_grad(flat_params, n_trees, beta)
+    penalty, penalty_grad = overlap_penalty_and_grad(flat_params, n_trees)
+    cost = side ** 2 + weight * penalty
+    grad = 2.0 * side * side_grad + weight * penalty_grad
+    # Parameter ekstra di luar N*3 (jika ada) tidak memengaruhi cost
+    full_grad = np.zeros(len(flat_params))
+    full_grad[:n_trees * 3] = grad
+    return cost, full_grad
+
+def _separate(flat_params, n_trees, margins=(1e-7, 1e-6, 1e-5, 1e-4)):
+    """
+    Metode penalti selalu menyisakan penetrasi sangat kecil. Tahap akhir ini
+    hanya meminimalkan penalti dengan margin kecil (tanpa suku sisi) sampai
+    tidak ada pasangan yang tumpang tindih.
+    """
+    x = np.array(flat_params, dtype=np.float64)
+    for margin in margins:
+        if not has_overlap(x, n_trees):
+            break
+        result = minimize(
+            overlap_penalty_and_grad,
+            x,
+            args=(n_trees, margin),
+            jac=True,
+            method="L-BFGS-B",
+        )
+        instrument.count("optimizer.iterations", result.nit)
+        x = result.x
+    return x
+
+def gradient_squeeze(initial_state, n_trees, method="L-BFGS-B", anneal=True, maxiter=1000):
+    """
+    Squeezer berbasis gradien (L-BFGS-B / SLSQP) dengan jac analitik.
+    Jika anneal=True, kehalusan soft-max dan bobot penalti dinaikkan bertahap.
+    """
+    stages = list(zip(SOFTMAX_BETAS, DEPTH_WEIGHTS))
+    if not anneal:
+        stages = stages[-1:]
+
+    x = np.array(initial_state, dtype=np.float64)
+    for beta, weight in stages:
+        result = minimize(
+            smooth_objective_and_grad,
+            x,
+            args=(n_trees, beta, weight),
+            jac=True,
+            method=method,
+            options={'maxiter': maxiter},
+        )
+        instrument.count("optimizer.iterations", result.nit)
+        x = result.x
+
+    x = _separate(x, n_trees)
+    final_side = float(layout_side(x, n_trees))
+    return final_side, x
+
+def evaluate_batch(states, penalty_weight=PENALTY_WEIGHT):
+    """
+    Menilai satu populasi layout sekaligus.
+    states: (B, N*3) dengan format [x1, y1, d1, x2, y2, d2, ...] per baris.
+    Return: (side, overlap, cost), masing-masing array (B,).
+    """
+    states = np.atleast_2d(np.asarray(states, dtype=np.float64))
+    n_batch = len(states)
+    n_trees = states.shape[1] // 3
+
+    # Geometri seluruh populasi dalam satu broadcast
+    verts = state_to_vertices(states)
+    side = bounding_square_side(verts)
+
+    # Broad phase per layout, lalu exact intersection untuk semua kandidat
+    # dari semua layout dalam satu panggilan Shapely
+    b, i, j = batch_candidate_pairs(aabb_from_vertices(verts))
+    instrument.count("cost.calls", n_batch)
+    instrument.count("overlap.pairs_exact", len(b))
+    instrument.count("overlap.pairs_pruned", n_batch * n_trees * (n_trees - 1) // 2 - len(b))
+    overlap = np.zeros(n_batch)
+    if len(b):
+        with instrument.timer("shapely"):
+            polys = polys_from_vertices(verts.reshape(-1, *verts.shape[-2:]))
+            flat_i = b * n_trees + i
+            flat_j = b * n_trees + j
+            hit = shapely.intersects(polys[flat_i], polys[flat_j])
+            areas = shapely.area(shapely.intersection(polys[flat_i[hit]], polys[flat_j[hit]]))
+        overlap = np.bincount(b[hit], weights=areas, minlength=n_batch)
+
+    cost = side ** 2 + overlap * penalty_weight
+    return side, overlap, cost
+
+class IncrementalCost:
+    """
+    Evaluator cost yang menyimpan cache per pohon (polygon, extent) dan
+    per pasangan (luas overlap). move(i, ...) hanya menghitung ulang pasangan
+    yang melibatkan pohon i: O(k) cek exact, bukan O(N^2).
+
+    Cost identik dengan objective_function: side^2 + overlap * PENALTY_WEIGHT.
+    """
+    def __init__(self, initial_state, n_trees, penalty_weight=PENALTY_WEIGHT):
+        self.n_trees = n_trees
+        self.penalty_weight = penalty_weight
+        self.state = np.array(initial_state[:n_trees * 3], dtype=np.float64).reshape(n_trees, 3)
+
+        verts = state_to_vertices(self.state.ravel())
+        self.polys = polys_from_vertices(verts)
+        self.boxes = aabb_from_vertices(verts)
+
+        # Matriks overlap simetris per pasangan
+        self.pair_overlap = np.zeros((n_trees, n_trees))
+        i, j, areas = overlap_pairs(self.polys)
+        self.pair_overlap[i, j] = areas
+        self.pair_overlap[j, i] = areas
+        self.overlap_area = float(areas.sum())
+
+        # Empat heap (min_x, min_y, -max_x, -max_y) dengan lazy deletion:
+        # entri lama ditandai basi lewat nomor versi pohon
+        self._version = np.zeros(n_trees, dtype=np.int64)
+        self._rebuild_heaps()
+
+    def _rebuild_heaps(self):
+        self._heaps = []
+        for k in range(4):
+            sign = 1.0 if k < 2 else -1.0
+            heap = [(sign * self.boxes[i, k], i, int(self._version[i])) for i in range(self.n_trees)]
+            heapq.heapify(heap)
+            self._heaps.append(heap)
+
+    def _extreme(self, k):
+        heap = self._heaps[k]
+        while heap[0][2] != self._version[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0]
+
+    @property
+    def bounds(self):
+        """[min_x, min_y, max_x, max_y] seluruh layout."""
+        return (self._extreme(0)[0], self._extreme(1)[0],
+                -self._extreme(2)[0], -self._extreme(3)[0])
+
+    @property
+    def side(self):
+        min_x, min_y, max_x, max_y = self.bounds
+        return max(max_x - min_x, max_y - min_y)
+
+    @property
+    def cost(self):
+        return self.side ** 2 + self.overlap_area * self.penalty_weight
+
+    def flat_state(self):
+        """State dalam format flat [x1, y1, d1, x2, y2, d2, ...]."""
+        return self.state.ravel().copy()
+
+    def boundary_trees(self, tol=1e-9):
+        """Pohon yang saat ini menyentuh sisi bounding box (dari extent heap)."""
+        return boundary_trees(self.boxes, self.bounds, tol)
+
+    def active_trees(self, tol=1e-9, margin=0.1):
+        """Pohon boundary + tetangga penghalangnya (lihat collision.active_trees)."""
+        return active_trees(self.boxes, self.bounds, tol, margin)
+
+    def move(self, i, x, y, deg):
+        """
+        Pindahkan pohon i ke (x, y, deg) dan perbarui cache. Return cost baru.
+        """
+        instrument.count("cost.incremental_moves")
+        self.state[i] = (x, y, deg)
+        verts = state_to_vertices(self.state[i])
+        poly = polys_from_vertices(verts)[0]
+        box = aabb_from_vertices(verts)[0]
+        self.polys[i] = poly
+        self.boxes[i] = box
+
+        # Broad phase AABB terhadap pohon lain, exact hanya untuk kandidat
+        b = self.boxes
+        near = (b[:, 0] <= box[2]) & (box[0] <= b[:, 2]) & (b[:, 1] <= box[3]) & (box[1] <= b[:, 3])
+        near[i] = False
+        cand = np.flatnonzero(near)
+
+        new_row = np.zeros(self.n_trees)
+        if len(cand):
+            with instrument.timer("shapely"):
+                hit = shapely.intersects(poly, self.polys[cand])
+                cand = cand[hit]
+                if len(cand):
+                    new_row[cand] = shapely.area(shapely.intersection(poly, self.polys[cand]))
+
+        self.overlap_area += new_row.sum() - self.pair_overlap[i].sum()
+        self.overlap_area = max(self.overlap_area, 0.0)
+        self.pair_overlap[i] = new_row
+        self.pair_overlap[:, i] = new_row
+
+        # Update heap extent: O(log N), entri lama otomatis jadi basi
+        self._version[i] += 1
+        version = int(self._version[i])
+        for k in range(4):
+            sign = 1.0 if k < 2 else -1.0
+            heapq.heappush(self._heaps[k], (sign * box[k], i, version))
+        if len(self._heaps[0]) > 4 * self.n_trees:
+            self._rebuild_heaps()
+
+        return self.cost
+
+class SubspaceCost:
+    """
+    Cost layout penuh (identik dengan objective_function) sebagai fungsi pose
+    pohon `active` saja; pohon lain diam. Polygon, AABB, extent dan overlap
+    antar pohon diam dihitung sekali di __init__, jadi satu evaluasi hanya
+    membangun k pohon aktif sekaligus lalu memanggil Shapely sekali untuk semua
+    pasangan (aktif, aktif) dan (aktif, diam) yang AABB-nya bersentuhan,
+    bukan k kali IncrementalCost.move.
+    """
+    def __init__(self, state, active, penalty_weight=PENALTY_WEIGHT):
+        state = np.asarray(state, dtype=np.float64).reshape(-1, 3)
+        self.active = np.asarray(active)
+        self.penalty_weight = penalty_weight
+        fixed = np.setdiff1d(np.arange(len(state)), self.active)
+
+        verts = state_to_vertices(state[fixed].ravel())
+        self.fixed_polys = polys_from_vertices(verts)
+        self.fixed_boxes = aabb_from_vertices(verts)
+        if len(fixed):
+            self.fixed_lo = self.fixed_boxes[:, :2].min(axis=0)
+            self.fixed_hi = self.fixed_boxes[:, 2:].max(axis=0)
+        else:
+            self.fixed_lo = np.full(2, np.inf)
+            self.fixed_hi = np.full(2, -np.inf)
+        _, _, areas = overlap_pairs(self.fixed_polys)
+        self.fixed_overlap = float(areas.sum())
+        self._iu, self._ju = np.triu_indices(len(self.active), 1)
+
+    def __call__(self, z):
+        instrument.count("cost.calls")
+        verts = state_to_vertices(z)
+        boxes = aabb_from_vertices(verts)
+        lo = np.minimum(boxes[:, :2].min(axis=0), self.fixed_lo)
+        hi = np.maximum(boxes[:, 2:].max(axis=0), self.fixed_hi)
+        side = float(np.max(hi - lo))
+
+        # Broad phase AABB: aktif vs diam (k, F) dan aktif vs aktif (i < j)
+        fb = self.fixed_boxes
+        near = ((boxes[:, None, 0] <= fb[None, :, 2]) & (fb[None, :, 0] <= boxes[:, None, 2]) &
+                (boxes[:, None, 1] <= fb[None, :, 3]) & (fb[None, :, 1] <= boxes[:, None, 3]))
+        a, f = np.nonzero(near)
+        bi, bj = boxes[self._iu], boxes[self._ju]
+        pair = ((bi[:, 0] <= bj[:, 2]) & (bj[:, 0] <= bi[:, 2]) &
+                (bi[:, 1] <= bj[:, 3]) & (bj[:, 1] <= bi[:, 3]))
+
+        overlap = self.fixed_overlap
+        if len(a) or pair.any():
+            polys = polys_from_vertices(verts)
+            left = np.concatenate([polys[a], polys[self._iu[pair]]])
+            right = np.concatenate([self.fixed_polys[f], polys[self._ju[pair]]])
+            with instrument.timer("shapely"):
+                hit = shapely.intersects(left, right)
+                if hit.any():
+                    overlap += float(shapely.area(shapely.intersection(left[hit], right[hit])).sum())
+        return side ** 2 + overlap * self.penalty_weight
+
+def rank_active_trees(boxes, active, max_active=None):
+    """
+    Urutkan pohon aktif menurut jaraknya ke sisi bounding box yang menentukan
+    side (sumbu terpanjang; keduanya jika hampir sama), terdekat dulu, lalu
+    ambil paling banyak max_active. Pohon boundary pada sumbu itu selalu di depan.
+    """
+    b = np.asarray(boxes)
+    lo, hi = b[:, :2].min(axis=0), b[:, 2:].max(axis=0)
+    extent = hi - lo
+    binding = extent >= extent.max() - 1e-9
+    gap = np.minimum(b[active, :2] - lo, hi - b[active, 2:])
+    slack = np.where(binding, gap, np.inf).min(axis=1)
+    ranked = np.asarray(active)[np.argsort(slack, kind="stable")]
+    return ranked if max_active is None else ranked[:max_active]
+
+def boundary_squeeze(initial_state, n_trees, rounds=50, maxiter=1000, margin=0.1, tol=1e-7,
+                     time_budget=None, max_active=8):
+    """
+    Squeezer subruang aktif: setiap ronde hanya pohon boundary (yang menyentuh
+    min_x/max_x/min_y/max_y) dan tetangga penghalangnya yang dioptimasi dengan
+    Nelder-Mead; pohon lain diam. Pohon aktif diurutkan menurut jaraknya ke sisi
+    yang menentukan side dan dibatasi max_active (Nelder-Mead memburuk cepat
+    di atas ~24 dimensi), jadi dimensi turun dari 3N ke paling banyak 3 * max_active.
+
+    Cost tiap ronde dievaluasi lewat SubspaceCost (satu evaluasi tervektorisasi
+    untuk semua pohon aktif); titik terbaik lalu diterapkan ke IncrementalCost,
+    yang memperbarui extent lewat heap untuk memilih pohon aktif ronde berikutnya.
+    Berhenti jika satu ronde tidak lagi memperbaiki cost > tol atau anggaran
+    waktu habis; sisa overlap kecil dari penalti dibersihkan dengan _separate.
+
+    Return: (final_side, final_coords) seperti squeeze_solution.
+    """
+    deadline = None if time_budget is None else time.time() + time_budget
+    inc = IncrementalCost(initial_state, n_trees)
+    best_cost = inc.cost
+
+    for _ in range(rounds):
+        if deadline is not None and time.time() >= deadline:
+            break
+        active = rank_active_trees(inc.boxes, inc.active_trees(margin=margin), max_active)
+        start = inc.state[active].ravel().copy()
+        subspace_cost = SubspaceCost(inc.state, active)
+
+        def check_deadline(intermediate_result):
+            if deadline is not None and time.time() >= deadline:
+                raise StopIteration
+
+        result = minimize(subspace_cost, start, method="Nelder-Mead", callback=check_deadline,
+                          options={"maxiter": maxiter, "adaptive": True})
+        instrument.count("optimizer.iterations", result.nit)
+        # Terapkan titik terbaik (evaluasi terakhir belum tentu titik terbaik)
+        z = result.x if result.fun < best_cost else start
+        for k, i in enumerate(active):
+            inc.move(i, *z[3 * k:3 * k + 3])
+        cost = inc.cost
+        improved = best_cost - cost
+        best_cost = min(best_cost, cost)
+        if improved <= tol:
+            break
+
+    final_coords = _separate(inc.flat_state(), n_trees)
+    final_side = float(layout_side(final_coords, n_trees))
+    return final_side, final_coords
+
+def squeeze_solution(initial_state, n_trees, penalty="area", method="Nelder-Mead", store=None,
+                     time_budget=SQUEEZE_TIME_BUDGET):
     """
     Menggunakan algoritma matematik untuk memadatkan posisi.
+    penalty: "area" (luas irisan Shapely) atau "depth" (kedalaman penetrasi SAT).
+    method: "Nelder-Mead" (default), metode gradien ("L-BFGS-B", "SLSQP"),
+            "boundary" (hanya pohon boundary, lihat boundary_squeeze),
+            atau "anneal" (simulated annealing tanpa overlap, src.annealing).
+    initial_state=None -> mulai dari seed_state (lattice / solusi N-1, N+1 di store).
+    time_budget: anggaran waktu (detik) untuk method "boundary".
     """
     base_poly = get_tree_polygon()
     
     # initial_state sekarang langsung digunakan sebagai tebakan awal
+    if initial_state is None:
+        initial_state = seed_state(n_trees, store=store)
     initial_guess = initial_state
     
     print(f"   Running Squeezer Optimizer for N={n_trees}...")
+
+    if method == "boundary":
+        return boundary_squeeze(initial_guess, n_trees, time_budget=time_budget)
+    if method == "anneal":
+        from .annealing import anneal
+        return anneal(initial_guess, n_trees)
+    if method != "Nelder-Mead":
+        return gradient_squeeze(initial_guess, n_trees, method=method)
     
-    # Jalankan Optimizer
+    # Jalankan Optimizer (cost di-cache: simplex sering kembali ke layout yang sama)
+    objective = depth_objective_cache if penalty == "depth" else objective_cache
     result = minimize(
-        objective_function, 
+        objective, 
         initial_guess, 
         args=(n_trees, base_poly),
         method='Nelder-Mead', # meminimalisasi geometri
         options={'maxiter': 5000, 'disp': False} # Menaikkan maxiter agar lebih teliti
     )
+    instrument.count("optimizer.iterations", result.nit)
     
     # --- HITUNG METRIK HASIL AKHIR ---
     final_coords = result.x
-    polys = create_polys_from_state_local(final_coords, n_trees, base_poly)
-    
-    min_x = min(p.bounds[0] for p in polys)
-    max_x = max(p.bounds[2] for p in polys)
-    min_y = min(p.bounds[1] for p in polys)
-    max_y = max(p.bounds[3] for p in polys)
-    
-    final_side = max(max_x - min_x, max_y - min_y)
+    final_side = float(layout_side(final_coords, n_trees))
     
     return final_side, final_coords
\ No newline at end of file
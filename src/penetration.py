@@ -0,0 +1,312 @@
+import math
+import numpy as np
+from . import instrument
+from .geometry import tree_boxes
+from .collision import candidate_pairs, batch_candidate_pairs
+
+# --- DEKOMPOSISI KONVEKS POHON ---
+# Poligon pohon = gabungan tepat 4 potongan konveks (urutan CCW):
+# tingkat atas (segitiga), tingkat tengah, tingkat bawah (trapesium) dan batang.
+# Segitiga dipadding dengan verteks kembar agar semua potongan berukuran 4.
+_PIECES = [
+    [(0.125, 0.5), (0.0, 0.8), (-0.125, 0.5), (-0.125, 0.5)],
+    [(0.2, 0.25), (0.0625, 0.5), (-0.0625, 0.5), (-0.2, 0.25)],
+    [(0.35, 0.0), (0.1, 0.25), (-0.1, 0.25), (-0.35, 0.0)],
+    [(0.075, -0.2), (0.075, 0.0), (-0.075, 0.0), (-0.075, -0.2)],
+]
+
+def _piece_normals(pieces):
+    """Normal satuan keluar tiap sisi potongan; sisi nol (padding) diganti sisi pertama."""
+    normals = np.empty_like(pieces)
+    for k, piece in enumerate(pieces):
+        edges = np.roll(piece, -1, axis=0) - piece
+        n = np.stack([edges[:, 1], -edges[:, 0]], axis=-1)
+        length = np.linalg.norm(n, axis=-1)
+        n[length == 0] = n[0]
+        length[length == 0] = length[0]
+        normals[k] = n / length[:, None]
+    return normals
+
+PIECE_VERTICES = np.array(_PIECES, dtype=np.float64)          # (4, 4, 2)
+PIECE_NORMALS = _piece_normals(PIECE_VERTICES)                 # (4, 4, 2)
+PIECE_VERTICES.setflags(write=False)
+PIECE_NORMALS.setflags(write=False)
+
+# Bobot penalti kedalaman^2: jauh lebih kecil dari penalti luas karena
+# gradiennya tidak pernah datar selama masih tumpang tindih
+DEPTH_PENALTY_WEIGHT = 10_000.0
+
+def tree_pieces(state):
+    """
+    Verteks dan normal semua potongan konveks di koordinat dunia.
+    state (..., N*3) -> (verts, normals), masing-masing (..., N, 4, 4, 2).
+    """
+    s = np.asarray(state, dtype=np.float64)
+    s = s.reshape(s.shape[:-1] + (-1, 3))
+    rad = np.deg2rad(s[..., 2])[..., None, None]
+    cos_t, sin_t = np.cos(rad), np.sin(rad)
+
+    px, py = PIECE_VERTICES[..., 0], PIECE_VERTICES[..., 1]
+    verts = np.empty(s.shape[:-1] + PIECE_VERTICES.shape)
+    verts[..., 0] = px * cos_t - py * sin_t + s[..., 0, None, None]
+    verts[..., 1] = px * sin_t + py * cos_t + s[..., 1, None, None]
+
+    nx, ny = PIECE_NORMALS[..., 0], PIECE_NORMALS[..., 1]
+    normals = np.empty_like(verts)
+    normals[..., 0] = nx * cos_t - ny * sin_t
+    normals[..., 1] = nx * sin_t + ny * cos_t
+    return verts, normals
+
+# Reduksi numpy pada sumbu sepanjang 4 sangat lambat; minimum berpasangan jauh lebih cepat
+def _min4(a):
+    return np.minimum(np.minimum(a[..., 0], a[..., 1]), np.minimum(a[..., 2], a[..., 3]))
+
+def _max4(a):
+    return np.maximum(np.maximum(a[..., 0], a[..., 1]), np.maximum(a[..., 2], a[..., 3]))
+
+class SatScratch:
+    """
+    Buffer kerja piece_pair_depths yang dipakai ulang antar panggilan (mis. satu
+    per env untuk hot path step). Tiap buffer tumbuh (kelipatan dua) hanya jika
+    jumlah pasangan melebihi kapasitasnya.
+    """
+    def __init__(self):
+        self._bufs = {}
+
+    def get(self, name, shape, dtype=np.float64):
+        size = math.prod(shape)
+        buf = self._bufs.get(name)
+        if buf is None or buf.size < size or buf.dtype != dtype:
+            buf = np.empty(max(size, 2 * buf.size) if buf is not None else size, dtype=dtype)
+            self._bufs[name] = buf
+        return buf[:size].reshape(shape)
+
+def piece_sat_depths(va, na, vb, nb, margin=0.0):
+    """
+    Kedalaman SAT per pasangan potongan tunggal (bukan per pasangan pohon).
+    va, na, vb, nb: (Q, 4, 2) -> (Q,); margin > 0: potongan yang jaraknya kurang
+    dari margin juga dihitung (kedalaman + margin).
+
+    Cukup 8 sumbu (normal kedua potongan): untuk poligon konveks, overlap
+    minimum atas semua arah selalu tercapai di salah satu normal sisinya.
+    """
+    return _sat_depths(np.stack([va, vb], axis=1), np.stack([na, nb], axis=1), margin, SatScratch())
+
+def _halve(op, a, out):
+    """Reduksi op pada sumbu terakhir (panjang 2^k) dengan membagi dua berulang ke buffer out."""
+    while a.shape[-1] > 1:
+        h = a.shape[-1] // 2
+        a = op(a[..., :h], a[..., h:], out=out[..., :h])
+        out = a
+    return a[..., 0]
+
+def _sat_depths(v, nrm, margin, scratch):
+    """
+    Inti piece_sat_depths di buffer scratch. v, nrm: (Q, 2, 4, 2) verteks & normal
+    potongan A dan B berdampingan -> kedalaman (Q,) (view buffer scratch).
+    """
+    q = len(v)
+    # Proyeksi 8 verteks (A lalu B) ke 8 sumbu lewat matmul batch: (Q, 2, 4, 8).
+    # Broadcast ufunc (Q, 8, 1) x (Q, 1, 8) jauh lebih lambat dan menyalin operand tiap panggilan
+    proj = np.matmul(v.reshape(q, 8, 2), nrm.reshape(q, 8, 2).transpose(0, 2, 1),
+                     out=scratch.get("proj", (q, 8, 8))).reshape(q, 2, 4, 8)
+    mx, mn = scratch.get("mx", (q, 2, 8)), scratch.get("mn", (q, 2, 8))
+    np.maximum(proj[:, :, 0], proj[:, :, 1], out=mx)
+    np.minimum(proj[:, :, 0], proj[:, :, 1], out=mn)
+    for k in (2, 3):
+        np.maximum(mx, proj[:, :, k], out=mx)
+        np.minimum(mn, proj[:, :, k], out=mn)
+    # Overlap di tiap sumbu: min(maxA - minB, maxB - minA); lalu minimum atas 8 sumbu
+    np.subtract(mx[:, 0], mn[:, 1], out=mn[:, 1])
+    np.subtract(mx[:, 1], mn[:, 0], out=mn[:, 0])
+    ov = np.minimum(mn[:, 0], mn[:, 1], out=mx[:, 0])                # (Q, 8)
+    depth = _halve(np.minimum, ov, ov)
+    depth = np.add(depth, margin, out=scratch.get("depth", (q,)))
+    return np.maximum(depth, 0.0, out=depth)
+
+def piece_pair_depths(verts, normals, i, j, margin=0.0, boxes=None, scratch=None):
+    """
+    Narrow phase murah untuk pasangan pohon (i[k], j[k]): pasangan potongan
+    disaring dulu lewat AABB potongan (diperlebar margin), lalu hanya yang
+    lolos dihitung dengan SAT 8 sumbu (piece_sat_depths).
+    verts, normals: (T, 4, 4, 2) dari tree_pieces; boxes: (lo, hi) AABB potongan
+    (T, 4, 2) jika sudah dihitung pemanggil. scratch: SatScratch opsional agar
+    temporary tidak dialokasikan ulang; k dan d lalu berupa view buffer-nya.
+    Return: (k, d) indeks pasangan pohon dan kedalaman tiap pasangan potongan kandidat.
+    """
+    scratch = SatScratch() if scratch is None else scratch
+    lo, hi = boxes if boxes is not None else (verts.min(axis=-2), verts.max(axis=-2))  # (T, 4, 2)
+    p = len(i)
+    ij = scratch.get("ij", (p, 2), np.intp)
+    ij[:, 0] = i
+    ij[:, 1] = j
+    lo_ab = np.take(lo, ij, axis=0, out=scratch.get("lo_ab", (p, 2, 4, 2)), mode="clip")
+    hi_ab = np.take(hi, ij, axis=0, out=scratch.get("hi_ab", (p, 2, 4, 2)), mode="clip")
+    if margin:
+        hi_ab += margin
+    near, tmp = scratch.get("near", (p, 4, 4), bool), scratch.get("near_tmp", (p, 4, 4), bool)
+    for ax in (0, 1):
+        lo_a, lo_b = lo_ab[:, 0, :, None, ax], lo_ab[:, 1, None, :, ax]
+        hi_a, hi_b = hi_ab[:, 0, :, None, ax], hi_ab[:, 1, None, :, ax]
+        if ax == 0:
+            np.less_equal(lo_a, hi_b, out=near)
+        else:
+            near &= np.less_equal(lo_a, hi_b, out=tmp)
+        near &= np.less_equal(lo_b, hi_a, out=tmp)
+
+    # Indeks datar near (pasangan pohon, potongan A, potongan B) -> indeks potongan global
+    flat = np.flatnonzero(near)
+    q = len(flat)
+    instrument.count("sat.piece_pairs", q)
+    k = np.right_shift(flat, 4, out=scratch.get("k", (q,), np.intp))
+    idx = np.take(ij, k, axis=0, out=scratch.get("idx", (q, 2), np.intp), mode="clip")
+    idx *= 4
+    idx[:, 1] += np.bitwise_and(flat, 3, out=scratch.get("qb", (q,), np.intp))
+    flat >>= 2
+    idx[:, 0] += np.bitwise_and(flat, 3, out=flat)
+    v = np.take(verts.reshape(-1, 4, 2), idx, axis=0, out=scratch.get("v", (q, 2, 4, 2)), mode="clip")
+    nrm = np.take(normals.reshape(-1, 4, 2), idx, axis=0, out=scratch.get("n", (q, 2, 4, 2)), mode="clip")
+    return k, _sat_depths(v, nrm, margin, scratch)
+
+def pair_depths(state, i, j):
+    """
+    Kedalaman penetrasi maksimum antar potongan untuk pasangan pohon (i[k], j[k]) -> (P,).
+    """
+    verts, normals = tree_pieces(state)
+    k, d = piece_pair_depths(verts, normals, i, j)
+    depth = np.zeros(len(i))
+    np.maximum.at(depth, k, d)
+    return depth
+
+def _candidates(state, n_trees, margin=0.0):
+    s = np.asarray(state, dtype=np.float64)[:n_trees * 3]
+    boxes = tree_boxes(s)
+    if margin:
+        boxes[:, :2] -= margin
+        boxes[:, 2:] += margin
+    i, j = candidate_pairs(boxes)
+    instrument.count("sat.pairs_checked", len(i))
+    instrument.count("sat.pairs_pruned", n_trees * (n_trees - 1) // 2 - len(i))
+    return s, (i, j)
+
+@instrument.timed("numpy")
+def overlap_penalty(state, n_trees):
+    """
+    Penalti overlap halus dan murah: jumlah kedalaman^2 semua pasangan potongan.
+    """
+    s, (i, j) = _candidates(state, n_trees)
+    if len(i) == 0:
+        return 0.0
+    _, d = piece_pair_depths(*tree_pieces(s), i, j)
+    return float(np.dot(d, d))
+
+@instrument.timed("numpy")
+def overlapping_pairs(state, n_trees, tol=0.0):
+    """
+    Mode boolean exact untuk validasi: pasangan (i, j) yang interiornya
+    benar-benar tumpang tindih (kedalaman > tol). Sekadar bersentuhan tidak dihitung.
+    """
+    s, (i, j) = _candidates(state, n_trees)
+    if len(i) == 0:
+        return i, j
+    hit = pair_depths(s, i, j) > tol
+    return i[hit], j[hit]
+
+def has_overlap(state, n_trees, tol=0.0):
+    """True jika ada pasangan pohon yang tumpang tindih."""
+    i, _ = overlapping_pairs(state, n_trees, tol)
+    return len(i) > 0
+
+@instrument.timed("numpy")
+def batch_overlap_penalty(states):
+    """
+    Penalti kedalaman^2 untuk batch layout (B, N*3) -> (B,).
+    """
+    states = np.atleast_2d(np.asarray(states, dtype=np.float64))
+    n_batch = len(states)
+    n_trees = states.shape[1] // 3
+
+    b, i, j = batch_candidate_pairs(tree_boxes(states))
+    instrument.count("sat.pairs_checked", len(b))
+    instrument.count("sat.pairs_pruned", n_batch * n_trees * (n_trees - 1) // 2 - len(b))
+    penalty = np.zeros(n_batch)
+    if len(b):
+        verts, normals = tree_pieces(states)
+        verts = verts.reshape(-1, 4, 4, 2)
+        normals = normals.reshape(-1, 4, 4, 2)
+        k, d = piece_pair_depths(verts, normals, b * n_trees + i, b * n_trees + j)
+        penalty = np.bincount(b[k], weights=d ** 2, minlength=n_batch)
+    return penalty
+
+def _perp(v):
+    """Rotasi 90 derajat CCW: turunan R(theta) v terhadap theta (radian)."""
+    return np.stack([-v[:, 1], v[:, 0]], axis=-1)
+
+@instrument.timed("numpy")
+def overlap_penalty_and_grad(state, n_trees, margin=0.0):
+    """
+    Penalti kedalaman^2 beserta gradien analitiknya terhadap state flat (N*3,).
+    margin > 0 ikut menghukum potongan yang jaraknya kurang dari margin
+    (dipakai untuk mendorong pohon benar-benar terpisah).
+
+    Untuk setiap pasangan potongan yang tumpang tindih, kedalaman
+    d = m . (vA - vB) dengan m sumbu SAT terpilih (bertanda), vA/vB verteks
+    pendukung. Turunannya: translasi -> +-m, rotasi -> lengan momen verteks
+    dan rotasi sumbu milik pohon pemiliknya. Gradien valid hampir di mana-mana.
+    """
+    s = np.asarray(state, dtype=np.float64)[:n_trees * 3]
+    grad = np.zeros((n_trees, 3))
+    i, j = _candidates(s, n_trees, margin)[1]
+    if len(i) == 0:
+        return 0.0, grad.ravel()
+
+    verts, normals = tree_pieces(s)
+    va, vb = verts[i], verts[j]
+    p = len(i)
+    axes = np.concatenate([normals[i].reshape(p, 16, 2), normals[j].reshape(p, 16, 2)], axis=1)
+
+    ax, ay = axes[:, :, None, 0], axes[:, :, None, 1]
+    proj_a = (ax * va.reshape(p, 1, 16, 2)[..., 0] + ay * va.reshape(p, 1, 16, 2)[..., 1]).reshape(p, 32, 4, 4)
+    proj_b = (ax * vb.reshape(p, 1, 16, 2)[..., 0] + ay * vb.reshape(p, 1, 16, 2)[..., 1]).reshape(p, 32, 4, 4)
+
+    ov1 = _max4(proj_a)[:, :, :, None] - _min4(proj_b)[:, :, None, :]
+    ov2 = _max4(proj_b)[:, :, None, :] - _min4(proj_a)[:, :, :, None]
+    overlap = np.minimum(ov1, ov2)
+    k_star = overlap.argmin(axis=1)                                   # (P, 4, 4)
+    depth = np.take_along_axis(overlap, k_star[:, None], axis=1)[:, 0] + margin
+
+    pp, pa, pb = np.nonzero(depth > 0)
+    if len(pp) == 0:
+        return 0.0, grad.ravel()
+    k = k_star[pp, pa, pb]
+    d = depth[pp, pa, pb]
+
+    # Tanda sumbu: +1 jika overlap = maxA - minB, -1 jika maxB - minA
+    sigma = np.where(ov1[pp, k, pa, pb] <= ov2[pp, k, pa, pb], 1.0, -1.0)
+    m = sigma[:, None] * axes[pp, k]
+
+    # Verteks pendukung sepanjang m: A paling jauh searah m, B paling jauh berlawanan
+    idx_a = np.where(sigma > 0, proj_a[pp, k, pa].argmax(-1), proj_a[pp, k, pa].argmin(-1))
+    idx_b = np.where(sigma > 0, proj_b[pp, k, pb].argmin(-1), proj_b[pp, k, pb].argmax(-1))
+    v_a = va[pp, pa, idx_a]
+    v_b = vb[pp, pb, idx_b]
+
+    ti, tj = i[pp], j[pp]
+    ra = v_a - s.reshape(-1, 3)[ti, :2]
+    rb = v_b - s.reshape(-1, 3)[tj, :2]
+
+    # dP/dd = 2d; rotasi dalam derajat
+    coef = 2.0 * d
+    rad = np.pi / 180.0
+    np.add.at(grad[:, 0], ti, coef * m[:, 0])
+    np.add.at(grad[:, 1], ti, coef * m[:, 1])
+    np.add.at(grad[:, 0], tj, -coef * m[:, 0])
+    np.add.at(grad[:, 1], tj, -coef * m[:, 1])
+    np.add.at(grad[:, 2], ti, coef * rad * (m * _perp(ra)).sum(-1))
+    np.add.at(grad[:, 2], tj, -coef * rad * (m * _perp(rb)).sum(-1))
+
+    # Sumbu ikut berputar bersama pohon pemiliknya
+    owner = np.where(k < 16, ti, tj)
+    np.add.at(grad[:, 2], owner, coef * rad * (_perp(m) * (v_a - v_b)).sum(-1))
+
+    return float((d ** 2).sum()), grad.ravel()
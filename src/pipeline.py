@@ -0,0 +1,320 @@
+import os
+import time
+import functools
+import numpy as np
+
+# Pipeline bersama train.py (CPU, satu env per puzzle) dan train_with_cuda.py
+# (env vectorized, worker per GPU). Stack RL (stable-baselines3, torch, tqdm) dan
+# solver (SciPy, Shapely) di-import di dalam fungsi, hanya jika ada puzzle yang dikerjakan
+from . import instrument
+from .utils import load_from_processed
+from .config import (
+    ensure_dirs,
+    MODELS_DIR,
+    CHECKPOINTS_DIR,
+    CHECKPOINT_FREQ,
+    CHECKPOINT_MIN_IMPROVEMENT,
+    CHECKPOINT_MIN_INTERVAL,
+    PROCESSED_DATA_DIR,
+    TOTAL_TIMESTEPS,
+    RL_ALGORITHM,
+    LEARNING_RATE,
+    N_WORKERS,
+    PUZZLE_RETRIES,
+    PUZZLE_TIMEOUT,
+    POLICY_TYPE,
+    USE_CURRICULUM,
+    CURRICULUM_TIMESTEPS,
+    N_STARTS,
+    SQUEEZE_TIME_BUDGET,
+    SQUEEZE_WORKERS,
+    USE_SEEDING,
+    SEED_NOISE,
+    ANNEAL_TIME_BUDGET,
+    INSTRUMENT,
+    METRICS_PATH,
+    REWARD_TERMS,
+    MAX_EPISODE_STEPS,
+)
+from .scheduler import run_puzzles
+from .store import SolutionStore
+
+# --- KONFIGURASI TARGET PUZZLE ---
+TARGET_PUZZLES = range(1, 51) # 1 - 200
+
+# Checkpoint JSON lama (sebelum solution store), dimigrasikan sekali
+LEGACY_CHECKPOINT = "final_solutions_checkpoint.json"
+
+def policy_for_config():
+    """Policy yang tidak bergantung N perlu kelasnya, bukan nama string (butuh torch)."""
+    if POLICY_TYPE == "TreeSetPolicy":
+        from .policy import TreeSetPolicy
+        return TreeSetPolicy
+    return POLICY_TYPE
+
+def model_path_for(n_trees):
+    """Path checkpoint model (tanpa .zip) untuk puzzle N."""
+    return os.path.join(MODELS_DIR, f"{RL_ALGORITHM}_tree_{n_trees:03d}")
+
+def checkpoint_dir_for(n_trees):
+    """Folder checkpoint training (best_model, latest, state.json) khusus puzzle N."""
+    return os.path.join(CHECKPOINTS_DIR, f"{RL_ALGORITHM}_tree_{n_trees:03d}")
+
+def make_env(n_trees, seed):
+    """ChristmasTreeEnv standar puzzle N dari seed (dipakai juga untuk rollout prediksi)."""
+    from .env import ChristmasTreeEnv
+    return ChristmasTreeEnv(
+        n_trees=n_trees, initial_state=seed, init_noise=SEED_NOISE,
+        reward_terms=REWARD_TERMS, max_episode_steps=MAX_EPISODE_STEPS,
+    )
+
+def make_train_env(n_trees, seed, n_envs=None):
+    """
+    Env training puzzle N dari seed. n_envs=None: satu make_env dibungkus
+    Monitor; selain itu ChristmasTreeVecEnv native (n_envs env di-step dalam satu
+    panggilan NumPy) dibungkus VecMonitor. Keduanya merekam reward episode untuk callback.
+    """
+    if n_envs is None:
+        from stable_baselines3.common.monitor import Monitor
+        return Monitor(make_env(n_trees, seed))
+    from stable_baselines3.common.vec_env import VecMonitor
+    from .vec_env import ChristmasTreeVecEnv
+    return VecMonitor(ChristmasTreeVecEnv(
+        n_envs=n_envs, n_trees=n_trees, initial_state=seed, init_noise=SEED_NOISE,
+        reward_terms=REWARD_TERMS, max_episode_steps=MAX_EPISODE_STEPS,
+    ))
+
+def checkpoint_callback(n_trees, **kwargs):
+    """Callback penyimpan model terbaik + checkpoint resume untuk puzzle N."""
+    from .agent import SaveOnBestTrainingRewardCallback
+    return SaveOnBestTrainingRewardCallback(
+        check_freq=1000, log_dir=checkpoint_dir_for(n_trees), n_trees=n_trees,
+        save_freq=CHECKPOINT_FREQ, min_improvement=CHECKPOINT_MIN_IMPROVEMENT,
+        min_interval=CHECKPOINT_MIN_INTERVAL, **kwargs,
+    )
+
+def train_and_solve(n_trees_target, n_envs=None):
+    """
+    Fungsi utama untuk menyelesaikan 1 puzzle.
+    Proses: RL Training -> Inference Kasar -> Optimasi Halus (Squeezer).
+    n_envs: jumlah env vectorized per proses (None = satu env, lihat make_train_env).
+    """
+
+    print(f"\n{'='*60}")
+    print(f"MEMULAI MISI UNTUK JUMLAH POHON: {n_trees_target}")
+    if n_envs is not None:
+        print(f"Vectorized Env: {n_envs} env dalam 1 proses")
+    print(f"{'='*60}")
+
+    # Import berat hanya di proses worker yang benar-benar melatih/menyelesaikan puzzle
+    from stable_baselines3 import PPO
+    from .multistart import collect_rollout_starts, multi_start_squeeze
+    from .seeding import seed_state
+    from .annealing import anneal
+    from .geometry import layout_side
+    from .agent import latest_checkpoint, load_compatible
+
+    # Counter & timer per puzzle (proses worker ini hanya mengerjakan satu puzzle)
+    instrument.enable(INSTRUMENT)
+    instrument.reset()
+
+    # --- SEED AWAL (lattice / solusi N-1, N+1 yang sudah tersimpan) ---
+    with instrument.phase("seed"):
+        seed = seed_state(n_trees_target, store=SolutionStore()) if USE_SEEDING else None
+
+    # --- SETUP ENVIRONMENT & MODEL ---
+    env = make_train_env(n_trees_target, seed, n_envs)
+
+    # Nama file model
+    model_path = model_path_for(n_trees_target)
+    model_name = os.path.basename(model_path)
+
+    # Cek apakah kita punya model yang sudah dilatih sebelumnya?
+    # Model dengan observation space lama (tidak cocok dengan env) dilatih ulang
+    model = None
+    if os.path.exists(model_path + ".zip"):
+        print(f"Model ditemukan: {model_name}.zip")
+        print("   Memuat model untuk melanjutkan/memprediksi...")
+        model = load_compatible(PPO, model_path, env)
+    if model is None:
+        checkpoint_dir = checkpoint_dir_for(n_trees_target)
+        resume_path = latest_checkpoint(checkpoint_dir)
+        if resume_path is not None:
+            # Resume run yang terputus: bobot, state optimizer dan num_timesteps ikut dimuat
+            model = load_compatible(PPO, resume_path, env)
+        if model is not None:
+            print(f"Checkpoint ditemukan: resume dari langkah {model.num_timesteps}")
+        else:
+            print(f"Model tidak ditemukan. Membuat model baru...")
+            # device='auto' (default SB3): GPU/CUDA jika tersedia, fallback ke CPU
+            model = PPO(policy_for_config(), env, verbose=0, learning_rate=LEARNING_RATE)
+
+        # --- TRAINING LOOP ---
+        remaining = max(TOTAL_TIMESTEPS - model.num_timesteps, 0)
+        print(f"Mulai Training selama {remaining} langkah...")
+
+        # Setup Callback (akan menyimpan model terbaik saat training)
+        callback = checkpoint_callback(n_trees_target, metrics_path=METRICS_PATH if INSTRUMENT else None)
+
+        start_time = time.time()
+        with instrument.phase("train"):
+            # reset_num_timesteps=False: hitungan langkah & jadwal learning rate melanjutkan checkpoint
+            model.learn(total_timesteps=remaining, callback=callback, reset_num_timesteps=False)
+        end_time = time.time()
+
+        print(f"Training selesai dalam {(end_time - start_time):.2f} detik.")
+        with instrument.phase("save"):
+            model.save(model_path) # Simpan versi terakhir
+
+    # --- PREDIKSI KASAR (RL INFERENCE) ---
+    print("AI sedang mencoba menyusun posisi awal...")
+
+    # Env vectorized tidak memberi state akhir per episode: prediksi memakai env standar
+    if n_envs is not None:
+        env = make_env(n_trees_target, seed)
+    # Beberapa rollout (1 deterministik + sisanya stokastik) sebagai titik awal
+    with instrument.phase("rollout"):
+        starts = collect_rollout_starts(model, env, N_STARTS)
+    if seed is not None:
+        # Seed itu sendiri juga ikut sebagai titik awal squeezer
+        starts.append((seed, float(layout_side(seed)) ** 2))
+    initial_score = min(score for _, score in starts)
+    print(f"Skor Awal AI (Area): {initial_score:.4f}")
+
+    # --- OPTIMASI HALUS (THE SQUEEZER) ---
+    print("Menjalankan 'The Squeezer' (SciPy Optimize)...")
+
+    # Multi-start dengan anggaran waktu: titik awal buruk dipangkas lebih awal
+    with instrument.phase("squeeze"):
+        final_side, final_coords = multi_start_squeeze(
+            [state for state, _ in starts],
+            n_trees_target,
+            time_budget=SQUEEZE_TIME_BUDGET,
+            n_workers=SQUEEZE_WORKERS,
+        )
+
+    if ANNEAL_TIME_BUDGET:
+        # Perhalus dengan simulated annealing: gerakan per pohon, selalu bebas overlap
+        print("Menjalankan simulated annealing...")
+        with instrument.phase("anneal"):
+            final_side, final_coords = anneal(final_coords, n_trees_target, time_budget=ANNEAL_TIME_BUDGET)
+
+    final_score = final_side ** 2
+    if initial_score > 0:
+        improvement = ((initial_score - final_score) / initial_score) * 100
+    else:
+        improvement = 0.0
+
+    print(f"OPTIMASI SELESAI!")
+    print(f"      Skor Akhir (Area): {final_score:.4f}")
+    print(f"      Sisi Kotak (Side): {final_side:.4f}")
+    print(f"      Peningkatan: {improvement:.2f}% lebih padat.")
+
+    if INSTRUMENT:
+        # Satu record per puzzle: waktu per fase, counter hot path, Shapely vs NumPy
+        instrument.write_record(
+            METRICS_PATH, event="puzzle", n=n_trees_target,
+            initial_score=initial_score, final_side=final_side, final_score=final_score,
+        )
+
+    # --- FORMAT HASIL UNTUK DISIMPAN ---
+    solution_list = []
+    for i in range(n_trees_target):
+        idx = i * 3
+        solution_list.append({
+            "id": f"{n_trees_target:03d}_{i}",
+            "x": final_coords[idx],
+            "y": final_coords[idx+1],
+            "deg": final_coords[idx+2]
+        })
+
+    return solution_list
+
+def run_training(source, n_envs=None, workers=None):
+    """
+    Program utama train.py / train_with_cuda.py: migrasi checkpoint JSON lama,
+    kurikulum (opsional), lalu semua puzzle TARGET_PUZZLES yang belum ada di
+    store dikerjakan paralel oleh scheduler dan disimpan begitu selesai.
+
+    source: nama script (dicatat di store). n_envs: lihat train_and_solve.
+    workers: fungsi tanpa argumen -> (jumlah worker, thread per worker), dipanggil
+    hanya jika ada puzzle yang dikerjakan; default (N_WORKERS, 1).
+    Return: exit code.
+    """
+    print("PROGRAM STARTED")
+    ensure_dirs()
+
+    # --- SOLUTION STORE (SQLite, satu baris per N) ---
+    store = SolutionStore()
+
+    # Migrasi sekali dari checkpoint JSON lama jika masih ada, lalu file lama diberi akhiran .migrated
+    legacy = load_from_processed(LEGACY_CHECKPOINT)
+    if isinstance(legacy, list) and legacy:
+        migrated = store.import_rows(legacy, source=LEGACY_CHECKPOINT)
+        print(f"Migrasi {migrated} puzzle dari {LEGACY_CHECKPOINT} ke solution store.")
+        legacy_path = os.path.join(PROCESSED_DATA_DIR, LEGACY_CHECKPOINT)
+        os.replace(legacy_path, legacy_path + ".migrated")
+
+    # Puzzle yang sudah ada di store tidak dikerjakan lagi
+    done = store.completed()
+    todo = [n for n in TARGET_PUZZLES if n not in done]
+    for n in TARGET_PUZZLES:
+        if n in done:
+            print(f"Skip N={n} (Sudah ada di database)")
+    if not todo:
+        # Semua puzzle sudah selesai: keluar tanpa pernah memuat torch / stable-baselines3
+        print("\nSEMUA TARGET SELESAI! Jalankan 'python submit.py' untuk mengumpulkan hasil.")
+        return 0
+
+    from tqdm import tqdm
+
+    # Kurikulum: latih model berurutan N kecil -> besar (warm start), lalu
+    # tahap solve paralel di bawah tinggal memuat model yang sudah ada
+    if USE_CURRICULUM:
+        from .curriculum import train_curriculum
+        from .seeding import seed_state
+
+        def curriculum_seed(n):
+            # Seed yang sama dengan tahap solve, agar PPO dilatih dari layout awal yang sama
+            return seed_state(n, store=store) if USE_SEEDING else None
+
+        train_curriculum(
+            todo,
+            make_env=lambda n: make_train_env(n, curriculum_seed(n), n_envs),
+            model_path_for=model_path_for,
+            callback_for=lambda n: checkpoint_callback(n, verbose=0),
+            checkpoint_dir_for=checkpoint_dir_for,
+            first_timesteps=TOTAL_TIMESTEPS,
+            step_timesteps=CURRICULUM_TIMESTEPS,
+            learning_rate=LEARNING_RATE,
+            verbose=0,
+        )
+
+    n_workers, threads_per_worker = workers() if workers else (N_WORKERS, 1)
+    print(f"Worker paralel: {n_workers} ({threads_per_worker} thread per worker)")
+    progress = tqdm(total=len(todo), desc="Total Progress")
+
+    def on_result(n, sol):
+        state = np.array([[item["x"], item["y"], item["deg"]] for item in sol])
+        # Simpan begitu puzzle selesai; store.put memvalidasi ketat dan hanya
+        # mengganti jika lebih baik, jadi layout yang overlap tidak pernah masuk store
+        store.put(n, state, source=f"{source}:{RL_ALGORITHM}+squeeze")
+        progress.update(1)
+
+    # Puzzle dikerjakan paralel; error pada satu N tidak menghentikan N lainnya.
+    # partial dari fungsi top-level tetap bisa di-pickle untuk worker spawn
+    failed = run_puzzles(
+        todo,
+        functools.partial(train_and_solve, n_envs=n_envs),
+        on_result,
+        n_workers=n_workers,
+        threads_per_worker=threads_per_worker,
+        retries=PUZZLE_RETRIES,
+        timeout=PUZZLE_TIMEOUT,
+    )
+    progress.close()
+    if failed:
+        print(f"Puzzle gagal: {sorted(failed)}")
+
+    print("\nSEMUA TARGET SELESAI! Jalankan 'python submit.py' untuk mengumpulkan hasil.")
+    return 0
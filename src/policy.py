@@ -0,0 +1,85 @@
+import torch as th
+from torch import nn
+from stable_baselines3.common.policies import ActorCriticPolicy
+
+class TreeSetNetwork(nn.Module):
+    """
+    Encoder permutation-invariant (DeepSets) untuk layout N pohon.
+
+    Setiap pohon diubah menjadi fitur lokal [x - cx, y - cy, sin, cos] lalu
+    dilewatkan MLP yang sama (bobot dibagi antar pohon). Konteks global berupa
+    mean + max pooling atas semua pohon. Tidak ada bobot yang bergantung pada N.
+    """
+    def __init__(self, hidden_dim=64):
+        super().__init__()
+        self.encoder = nn.Sequential(
+            nn.Linear(4, hidden_dim), nn.Tanh(),
+            nn.Linear(hidden_dim, hidden_dim), nn.Tanh(),
+        )
+        self.actor = nn.Sequential(nn.Linear(3 * hidden_dim, hidden_dim), nn.Tanh())
+        self.critic = nn.Sequential(nn.Linear(2 * hidden_dim, hidden_dim), nn.Tanh())
+        # Dibaca oleh ActorCriticPolicy; latent aktor berukuran hidden_dim per pohon
+        self.latent_dim_pi = hidden_dim
+        self.latent_dim_vf = hidden_dim
+
+    def _encode(self, features):
+        trees = features.reshape(features.shape[0], -1, 3)
+        xy = trees[..., :2] - trees[..., :2].mean(dim=1, keepdim=True)
+        rad = th.deg2rad(trees[..., 2:3])
+        h = self.encoder(th.cat([xy, th.sin(rad), th.cos(rad)], dim=-1))      # (B, N, H)
+        context = th.cat([h.mean(dim=1), h.max(dim=1).values], dim=-1)         # (B, 2H)
+        return h, context
+
+    def forward(self, features):
+        return self.forward_actor(features), self.forward_critic(features)
+
+    def forward_actor(self, features):
+        h, context = self._encode(features)
+        context = context.unsqueeze(1).expand(-1, h.shape[1], -1)
+        return self.actor(th.cat([h, context], dim=-1))                        # (B, N, H)
+
+    def forward_critic(self, features):
+        _, context = self._encode(features)
+        return self.critic(context)                                             # (B, H)
+
+class PerTreeHead(nn.Module):
+    """Linear (H -> 3) yang sama untuk setiap pohon, hasilnya di-flatten ke (B, N*3)."""
+    def __init__(self, hidden_dim):
+        super().__init__()
+        self.linear = nn.Linear(hidden_dim, 3)
+
+    def forward(self, latent):
+        return self.linear(latent).flatten(start_dim=1)
+
+class TreeSetPolicy(ActorCriticPolicy):
+    """
+    Policy PPO yang tidak bergantung ukuran puzzle: bobotnya bisa dipakai ulang
+    dari model N-1 ke model N (warm start) lewat model.set_parameters(path).
+    log_std juga dibagi per koordinat [x, y, deg], bukan per pohon.
+    """
+    def __init__(self, *args, hidden_dim=64, **kwargs):
+        self.hidden_dim = hidden_dim
+        super().__init__(*args, **kwargs)
+
+    def _get_constructor_parameters(self):
+        data = super()._get_constructor_parameters()
+        data.update(hidden_dim=self.hidden_dim)
+        return data
+
+    def _build_mlp_extractor(self):
+        self.mlp_extractor = TreeSetNetwork(self.hidden_dim).to(self.device)
+
+    def _build(self, lr_schedule):
+        super()._build(lr_schedule)
+        # Ganti head aksi & log_std bawaan (berukuran N*3) dengan versi per pohon
+        self.action_net = PerTreeHead(self.hidden_dim).to(self.device)
+        self.log_std = nn.Parameter(th.ones(3, device=self.device) * self.log_std_init)
+        if self.ortho_init:
+            self.action_net.apply(lambda m: self.init_weights(m, gain=0.01))
+        # Optimizer dibuat ulang agar memuat parameter head yang baru
+        self.optimizer = self.optimizer_class(self.parameters(), lr=lr_schedule(1), **self.optimizer_kwargs)
+
+    def _get_action_dist_from_latent(self, latent_pi):
+        mean_actions = self.action_net(latent_pi)
+        n_trees = mean_actions.shape[1] // 3
+        return self.action_dist.proba_distribution(mean_actions, self.log_std.repeat(n_trees))
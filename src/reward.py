@@ -0,0 +1,117 @@
+import numpy as np
+
+class StepGeometry:
+    """
+    Geometri layout pada satu step, dipakai bersama oleh semua term reward.
+
+    Setiap besaran (side, overlap, pair_distance) dihitung lazy dan paling banyak
+    sekali per step, berapa pun jumlah term yang membacanya. Bekerja untuk satu
+    layout (skalar) maupun batch VecEnv (array (E,)).
+
+    centers: posisi pohon (..., N, 2); side_fn / overlap_fn: fungsi tanpa argumen.
+    Env membuat satu objek di __init__ (centers = view ke buffer state) dan
+    memanggil clear() setiap step, jadi tidak ada alokasi objek per step.
+    """
+    def __init__(self, centers, side_fn, overlap_fn):
+        self.centers = centers
+        self._side_fn = side_fn
+        self._overlap_fn = overlap_fn
+        self._cache = {}
+
+    def clear(self):
+        """Lupakan nilai step sebelumnya (state sudah berubah in place)."""
+        self._cache.clear()
+
+    def _cached(self, name, fn):
+        if name not in self._cache:
+            self._cache[name] = fn()
+        return self._cache[name]
+
+    @property
+    def side(self):
+        return self._cached("side", self._side_fn)
+
+    @property
+    def overlap(self):
+        return self._cached("overlap", self._overlap_fn)
+
+    @property
+    def pair_distance(self):
+        """
+        Rata-rata jarak^2 antar pusat pohon atas semua pasangan, O(N):
+        sum_{i<j} |ci - cj|^2 = N * sum_i |ci - c_rata2|^2.
+        """
+        def compute():
+            c = np.asarray(self.centers, dtype=np.float64)
+            n = c.shape[-2]
+            if n < 2:
+                return np.zeros(c.shape[:-2])
+            spread = ((c - c.mean(axis=-2, keepdims=True)) ** 2).sum(axis=(-2, -1))
+            return spread * 2.0 / (n - 1)
+        return self._cached("pair_distance", compute)
+
+# Besaran dasar yang bisa dipakai sebagai term reward (semuanya "makin kecil makin baik")
+TERMS = {
+    "side": lambda g: g.side,
+    "area": lambda g: g.side ** 2,
+    "overlap": lambda g: g.overlap,
+    "pair_distance": lambda g: g.pair_distance,
+}
+
+# Reward lama: -area - overlap * 10000
+DEFAULT_REWARD_TERMS = {"area": 1.0, "overlap": 10000.0}
+
+class RewardShaper:
+    """
+    Reward sebagai kombinasi term berbobot, dikonfigurasi lewat dict {nama: bobot}.
+
+    - "<term>"       -> reward -= bobot * nilai (penalti dense setiap step)
+    - "delta_<term>" -> reward += bobot * (nilai_step_lalu - nilai), yaitu
+                        perbaikan sejak step sebelumnya (0 di step pertama episode)
+
+    <term> salah satu dari TERMS: side, area, overlap, pair_distance.
+    Nilai step lalu disimpan per env; reset(idx) melupakannya untuk env yang
+    baru di-reset (idx=None -> semua).
+    """
+    def __init__(self, terms=None):
+        self.terms = dict(DEFAULT_REWARD_TERMS if terms is None else terms)
+        self._specs = []
+        for name, weight in self.terms.items():
+            base = name[len("delta_"):] if name.startswith("delta_") else name
+            if base not in TERMS:
+                raise ValueError(f"Term reward tidak dikenal: {name!r} (pilihan: {sorted(TERMS)})")
+            self._specs.append((name, base, name != base, float(weight)))
+        self._prev = {}
+
+    def reset(self, idx=None):
+        if idx is None:
+            self._prev = {}
+            return
+        for prev in self._prev.values():
+            prev[idx] = np.nan
+
+    def __call__(self, geom):
+        """Hitung reward (skalar atau (E,)) dari StepGeometry step ini."""
+        reward = 0.0
+        values = {}
+        for name, base, is_delta, weight in self._specs:
+            if base not in values:
+                values[base] = np.asarray(TERMS[base](geom), dtype=np.float64)
+            value = values[base]
+            if not is_delta:
+                reward = reward - weight * value
+                continue
+            prev = self._prev.get(base)
+            if prev is None or prev.shape != value.shape:
+                prev = np.full(value.shape, np.nan)
+            reward = reward + weight * np.where(np.isnan(prev), 0.0, prev - value)
+        # Simpan nilai step ini untuk term delta (setelah semua term dihitung)
+        for name, base, is_delta, _ in self._specs:
+            if not is_delta:
+                continue
+            prev = self._prev.get(base)
+            if prev is not None and prev.shape == values[base].shape:
+                np.copyto(prev, values[base])
+            else:
+                self._prev[base] = values[base].copy()
+        return reward
@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+import queue
+import traceback
+import contextlib
+import multiprocessing as mp
+
+# Variabel lingkungan pool thread BLAS/OpenMP (NumPy, SciPy, torch)
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+@contextlib.contextmanager
+def _thread_env(n_threads):
+    """
+    Set sementara batas thread di os.environ; proses anak (spawn) mewarisinya
+    sebelum NumPy/torch dimuat, sedangkan proses utama tidak ikut dibatasi.
+    """
+    old = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+    os.environ.update({var: str(n_threads) for var in THREAD_ENV_VARS})
+    try:
+        yield
+    finally:
+        for var, value in old.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+def _worker(solve_fn, n, result_queue, n_threads=1):
+    """Dijalankan di proses terpisah: selesaikan satu puzzle lalu kirim hasilnya."""
+    # Banyak worker sekaligus: pool thread default torch (= jumlah core) per worker
+    # akan membuat mesin oversubscribed
+    os.environ.update({var: str(n_threads) for var in THREAD_ENV_VARS})
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(n_threads)
+    try:
+        result = solve_fn(n)
+        result_queue.put((n, True, result))
+    except Exception:
+        result_queue.put((n, False, traceback.format_exc()))
+
+def run_puzzles(puzzles, solve_fn, on_result, n_workers=None, retries=1, timeout=None,
+                poll_interval=0.5, threads_per_worker=1):
+    """
+    Menyelesaikan banyak puzzle secara paralel, satu proses per puzzle.
+
+    - Urutan kerja: N terbesar dulu agar beban antar worker seimbang.
+    - Kegagalan terisolasi per puzzle dan dicoba ulang hingga `retries` kali.
+    - `timeout` (detik) per percobaan; proses yang melewatinya dihentikan.
+    - `on_result(n, result)` dipanggil di proses utama begitu puzzle selesai,
+      sehingga hasil bisa langsung disimpan.
+    - Setiap worker dibatasi `threads_per_worker` thread BLAS/OpenMP/torch.
+
+    solve_fn harus fungsi top-level (bisa di-pickle). Return: dict {n: pesan error}
+    untuk puzzle yang tetap gagal setelah semua percobaan.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    ctx = mp.get_context("spawn")
+    result_queue = ctx.Queue()
+
+    pending = sorted(puzzles, reverse=True)
+    attempts = {n: 0 for n in pending}
+    running = {}   # n -> (process, waktu mulai)
+    failed = {}
+
+    def finish(n, ok, payload):
+        proc, _ = running.pop(n)
+        proc.join()
+        if ok:
+            on_result(n, payload)
+            return
+        if attempts[n] <= retries:
+            print(f"Puzzle N={n} gagal (percobaan {attempts[n]}), dicoba ulang...")
+            pending.append(n)
+        else:
+            print(f"Puzzle N={n} gagal permanen:\n{payload}")
+            failed[n] = payload
+
+    while pending or running:
+        # Isi slot worker yang kosong
+        while pending and len(running) < n_workers:
+            n = pending.pop(0)
+            attempts[n] += 1
+            # Non-daemon: worker boleh membuat proses anak (mis. SubprocVecEnv)
+            proc = ctx.Process(target=_worker, args=(solve_fn, n, result_queue, threads_per_worker),
+                               daemon=False)
+            with _thread_env(threads_per_worker):
+                proc.start()
+            running[n] = (proc, time.time())
+
+        # Kumpulkan hasil yang sudah masuk
+        try:
+            n, ok, payload = result_queue.get(timeout=poll_interval)
+            if n in running:
+                finish(n, ok, payload)
+        except queue.Empty:
+            pass
+
+        # Timeout dan crash (proses mati tanpa sempat mengirim hasil)
+        now = time.time()
+        for n, (proc, started) in list(running.items()):
+            if timeout is not None and now - started > timeout:
+                proc.terminate()
+                finish(n, False, f"Timeout setelah {timeout} detik")
+            elif proc.exitcode not in (None, 0):
+                finish(n, False, f"Proses worker berhenti dengan exit code {proc.exitcode}")
+
+    return failed
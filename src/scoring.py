@@ -0,0 +1,138 @@
+import csv
+import numpy as np
+from .geometry import state_to_vertices, polys_from_vertices
+from .collision import aabb_from_vertices, candidate_pairs
+from .penetration import tree_pieces, piece_pair_depths
+
+# Batas koordinat yang diterima metrik kompetisi
+COORD_LIMIT = 100.0
+
+# Pasangan yang jarak/kedalaman SAT-nya dalam +-STRICT_TOL dianggap ambigu
+# (hampir bersentuhan) dan baru diputuskan exact oleh Shapely. Di luar pita ini
+# NumPy saja sudah pasti, jadi submission yang valid dinilai tanpa Shapely.
+STRICT_TOL = 1e-9
+
+def read_submission(path):
+    """
+    Baca CSV submission (id,x,y,deg dengan prefix 's').
+    Return: dict {n: state (n, 3) float64}, urut berdasarkan N.
+    """
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        col = {name: k for k, name in enumerate(header)}
+        rows = list(reader)
+
+    ids = [r[col['id']] for r in rows]
+    coords = np.array(
+        [[r[col['x']].lstrip('s'), r[col['y']].lstrip('s'), r[col['deg']].lstrip('s')] for r in rows],
+        dtype=np.float64,
+    )
+
+    groups = {}
+    for k, tree_id in enumerate(ids):
+        pid, idx = tree_id.split('_')
+        groups.setdefault(int(pid), []).append((int(idx), k))
+
+    puzzles = {}
+    for n in sorted(groups):
+        order = sorted(groups[n])
+        if [idx for idx, _ in order] != list(range(n)):
+            raise ValueError(f"Puzzle {n:03d} harus berisi tepat pohon 0..{n - 1}")
+        puzzles[n] = coords[[k for _, k in order]]
+    return puzzles
+
+def score_puzzles(puzzles):
+    """
+    Hitung sisi, skor dan validitas setiap puzzle sekaligus.
+
+    Semua pohon dari semua puzzle diproses dalam satu tensor verteks;
+    bounding square per puzzle memakai reduceat. Overlap dicek ketat seperti
+    metrik kompetisi: intersects dan bukan sekadar touches. Narrow phase memakai
+    SAT potongan konveks (NumPy); Shapely hanya untuk pasangan yang ambigu.
+    """
+    ns = np.array(sorted(puzzles))
+    states = np.concatenate([puzzles[n] for n in ns])
+    offsets = np.concatenate([[0], np.cumsum(ns)[:-1]])
+
+    verts = state_to_vertices(states.ravel())
+    boxes = aabb_from_vertices(verts)
+    mins = np.minimum.reduceat(boxes[:, :2], offsets, axis=0)
+    maxs = np.maximum.reduceat(boxes[:, 2:], offsets, axis=0)
+    sides = (maxs - mins).max(axis=1)
+
+    # Broad phase per puzzle, lalu narrow phase untuk semua kandidat sekaligus
+    pair_i, pair_j, pair_n = [], [], []
+    for n, off in zip(ns, offsets):
+        i, j = candidate_pairs(boxes[off:off + n])
+        pair_i.append(i + off)
+        pair_j.append(j + off)
+        pair_n.append(np.full(len(i), n))
+    pair_i, pair_j, pair_n = map(np.concatenate, (pair_i, pair_j, pair_n))
+
+    overlaps = {int(n): [] for n in ns}
+    if len(pair_i):
+        # Saring pasangan potongan konveks lewat AABB potongan, lalu SAT 8 sumbu.
+        # Kedalaman + STRICT_TOL: > 2*tol pasti overlap, 0 pasti terpisah
+        k, d = piece_pair_depths(*tree_pieces(states.ravel()), pair_i, pair_j, STRICT_TOL)
+        depth = np.zeros(len(pair_i))
+        np.maximum.at(depth, k, d)
+        bad = depth > 2 * STRICT_TOL
+        unsure = np.flatnonzero((depth > 0) & ~bad)
+        if len(unsure):
+            import shapely
+            # Poligon hanya untuk pohon yang terlibat di pasangan ambigu
+            trees = np.union1d(pair_i[unsure], pair_j[unsure])
+            polys = polys_from_vertices(verts[trees])
+            a = polys[np.searchsorted(trees, pair_i[unsure])]
+            b = polys[np.searchsorted(trees, pair_j[unsure])]
+            bad[unsure] = shapely.intersects(a, b) & ~shapely.touches(a, b)
+        for n, i, j in zip(pair_n[bad], pair_i[bad], pair_j[bad]):
+            start = offsets[np.searchsorted(ns, n)]
+            overlaps[int(n)].append((int(i - start), int(j - start)))
+
+    out_of_bounds = np.abs(states[:, :2]) > COORD_LIMIT
+    oob = np.logical_or.reduceat(out_of_bounds.any(axis=1), offsets)
+
+    report = {}
+    for k, n in enumerate(ns):
+        n = int(n)
+        side = float(sides[k])
+        report[n] = {
+            "n": n,
+            "side": side,
+            "score": side ** 2 / n,
+            "overlaps": overlaps[n],
+            "out_of_bounds": bool(oob[k]),
+            "valid": not overlaps[n] and not oob[k],
+        }
+    return report
+
+def total_score(report):
+    """Metrik kompetisi: jumlah side^2 / N atas semua puzzle."""
+    return float(sum(p["score"] for p in report.values()))
+
+def diff_reports(report, baseline):
+    """
+    Perbandingan per N terhadap submission baseline (format machine-readable).
+    delta < 0 berarti lebih baik dari baseline.
+    """
+    puzzles = []
+    for n in sorted(set(report) | set(baseline)):
+        cur, base = report.get(n), baseline.get(n)
+        puzzles.append({
+            "n": n,
+            "score": cur["score"] if cur else None,
+            "baseline_score": base["score"] if base else None,
+            "delta": cur["score"] - base["score"] if cur and base else None,
+            "valid": cur["valid"] if cur else None,
+        })
+    total, base_total = total_score(report), total_score(baseline)
+    return {
+        "total": total,
+        "baseline_total": base_total,
+        "delta": total - base_total,
+        "improved": [p["n"] for p in puzzles if p["delta"] is not None and p["delta"] < 0],
+        "regressed": [p["n"] for p in puzzles if p["delta"] is not None and p["delta"] > 0],
+        "puzzles": puzzles,
+    }
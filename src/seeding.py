@@ -0,0 +1,139 @@
+import numpy as np
+import shapely
+from .geometry import state_to_vertices, layout_side, tree_boxes, polys_from_vertices
+
+# --- POLA LATTICE ---
+# Motif interlocking: pohon tegak (0 deg) di (0, 0) dan pohon terbalik (180 deg)
+# di INTERLOCK_OFFSET yang mengisi celah di antara dua pohon tegak. Motif diulang
+# tiap INTERLOCK_DX ke kanan; baris berikutnya naik INTERLOCK_DY dan bergeser
+# INTERLOCK_SHIFT. Parameter hasil pencarian grid + bisection dengan jarak antar
+# pohon minimal 1e-4 (bukan sekadar bersentuhan), kepadatan ~3.0 pohon per unit^2.
+INTERLOCK_OFFSET = (0.42, 0.495)
+INTERLOCK_DX = 0.8354
+INTERLOCK_DY = 0.8001
+INTERLOCK_SHIFT = 0.2089
+
+# Grid biasa: semua pohon tegak, dibatasi lebar alas (0.7) dan tinggi (1.0)
+GRID_DX = 0.7001
+GRID_DY = 1.0001
+
+def _lattice_points(rows, cols, pattern):
+    """Semua slot lattice (rows*cols*motif, 3) dalam urutan baris (row-major)."""
+    r, c = np.meshgrid(np.arange(rows), np.arange(cols), indexing="ij")
+    if pattern == "grid":
+        x, y = c * GRID_DX, r * GRID_DY
+        return np.stack([x.ravel(), y.ravel(), np.zeros(x.size)], axis=-1)
+
+    # Geser baris modulo DX agar lattice tetap rapat ke kiri (himpunan titik sama)
+    x = c * INTERLOCK_DX + (r * INTERLOCK_SHIFT) % INTERLOCK_DX
+    y = r * INTERLOCK_DY
+    up = np.stack([x, y, np.zeros_like(x, dtype=np.float64)], axis=-1)
+    down = np.stack([x + INTERLOCK_OFFSET[0], y + INTERLOCK_OFFSET[1], np.full(x.shape, 180.0)], axis=-1)
+    return np.stack([up, down], axis=2).reshape(-1, 3)
+
+def center_state(state, n_trees):
+    """Geser layout sehingga pusat bounding box-nya di origin. Return flat N*3."""
+    s = np.array(state, dtype=np.float64).reshape(n_trees, 3)
+    boxes = tree_boxes(s.ravel())
+    b = np.concatenate([boxes[:, :2].min(axis=0), boxes[:, 2:].max(axis=0)])
+    s[:, 0] -= (b[0] + b[2]) / 2
+    s[:, 1] -= (b[1] + b[3]) / 2
+    return s.ravel()
+
+def lattice_layout(n_trees, pattern="interlock"):
+    """
+    Layout awal tanpa overlap dari pola lattice.
+    pattern: "interlock" (baris 0/180 deg saling mengunci) atau "grid" (semua tegak).
+
+    Semua jumlah kolom dicoba dan yang memberi bounding square terkecil dipilih.
+    Return: state flat N*3 yang sudah di-center.
+    """
+    per_slot = 1 if pattern == "grid" else 2
+    best_side, best = np.inf, None
+    for cols in range(1, -(-n_trees // per_slot) + 1):
+        rows = -(-n_trees // (cols * per_slot))
+        state = _lattice_points(rows, cols, pattern)[:n_trees].ravel()
+        side = layout_side(state)
+        if side < best_side:
+            best_side, best = side, state
+    return center_state(best, n_trees)
+
+def add_tree(state, n_trees, step=0.05, angles=(0.0, 90.0, 180.0, 270.0), chunk=4096):
+    """
+    Seed untuk N+1 dari solusi N: tambahkan satu pohon di celah terbaik.
+
+    Kandidat posisi berupa grid (jarak `step`) di dalam bounding box yang diperlebar
+    satu ukuran pohon, untuk setiap sudut di `angles`. Kandidat diurutkan dari sisi
+    bounding square terkecil (lalu yang paling dekat pusat), kemudian dicek per chunk
+    terhadap STRtree pohon yang sudah ada; kandidat pertama yang bebas dipakai.
+    Return: state flat (N+1)*3.
+    """
+    s = np.asarray(state, dtype=np.float64).reshape(n_trees, 3)
+    verts = state_to_vertices(s.ravel())
+    boxes = tree_boxes(s.ravel())
+    b = np.concatenate([boxes[:, :2].min(axis=0), boxes[:, 2:].max(axis=0)])
+    cx, cy = (b[0] + b[2]) / 2, (b[1] + b[3]) / 2
+
+    xs = np.arange(b[0] - 0.8, b[2] + 0.8 + step, step)
+    ys = np.arange(b[1] - 0.8, b[3] + 0.8 + step, step)
+    gx, gy, ga = np.meshgrid(xs, ys, np.asarray(angles, dtype=np.float64), indexing="ij")
+    cand = np.stack([gx.ravel(), gy.ravel(), ga.ravel()], axis=-1)         # (C, 3)
+
+    # Sisi bounding square jika kandidat ditambahkan (AABB gabungan)
+    boxes = tree_boxes(cand)[:, 0]                                          # (C, 4)
+    mins = np.minimum(boxes[:, :2], b[:2])
+    maxs = np.maximum(boxes[:, 2:], b[2:])
+    side = np.max(maxs - mins, axis=1)
+    dist = np.hypot(cand[:, 0] - cx, cand[:, 1] - cy)
+    order = np.lexsort((dist, np.round(side, 9)))
+
+    tree = shapely.STRtree(polys_from_vertices(verts))
+    for start in range(0, len(order), chunk):
+        idx = order[start:start + chunk]
+        polys = polys_from_vertices(state_to_vertices(cand[idx].ravel()))
+        hit = np.zeros(len(idx), dtype=bool)
+        hit[tree.query(polys, predicate="intersects")[0]] = True
+        free = np.flatnonzero(~hit)
+        if len(free):
+            return np.concatenate([s.ravel(), cand[idx[free[0]]]])
+
+    # Tidak ada celah di grid kandidat: taruh di kanan layout
+    return np.concatenate([s.ravel(), [b[2] + 0.5, cy, 0.0]])
+
+def remove_tree(state, n_trees):
+    """
+    Seed untuk N-1 dari solusi N: buang pohon yang paling mengecilkan bounding square.
+    Return: state flat (N-1)*3.
+    """
+    s = np.asarray(state, dtype=np.float64).reshape(n_trees, 3)
+    boxes = tree_boxes(s.ravel())                                         # (N, 4)
+
+    # Bounding box layout tanpa pohon i, untuk semua i sekaligus (N, N, 4)
+    removed = np.eye(n_trees, dtype=bool)[..., None]
+    mins = np.where(removed, np.inf, boxes[None, :, :2]).min(axis=1)
+    maxs = np.where(removed, -np.inf, boxes[None, :, 2:]).max(axis=1)
+    side = np.max(maxs - mins, axis=1)
+    return np.delete(s, int(np.argmin(side)), axis=0).ravel()
+
+def seed_candidates(n_trees, store=None, pattern="interlock"):
+    """
+    Semua seed yang tersedia untuk puzzle N: {"lattice", "from_prev", "from_next"}.
+    from_prev / from_next hanya ada jika store punya solusi N-1 / N+1.
+    """
+    seeds = {"lattice": lattice_layout(n_trees, pattern)}
+    if store is not None:
+        prev = store.get(n_trees - 1) if n_trees > 1 else None
+        if prev is not None:
+            seeds["from_prev"] = center_state(add_tree(prev["state"], n_trees - 1), n_trees)
+        nxt = store.get(n_trees + 1)
+        if nxt is not None:
+            seeds["from_next"] = center_state(remove_tree(nxt["state"], n_trees + 1), n_trees)
+    return seeds
+
+def seed_state(n_trees, store=None, pattern="interlock"):
+    """
+    Seed terbaik (bounding square terkecil) untuk puzzle N sebagai state flat N*3.
+    Pengganti tumpukan acak uniform(-2, 2) untuk reset env dan squeezer.
+    """
+    seeds = seed_candidates(n_trees, store, pattern)
+    return min(seeds.values(), key=lambda s: float(layout_side(s)))
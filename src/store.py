@@ -0,0 +1,158 @@
+import os
+import time
+import sqlite3
+from contextlib import contextmanager
+import numpy as np
+from .config import PROCESSED_DATA_DIR
+from .scoring import score_puzzles
+from .archive import write_archive, puzzles_from_rows
+
+DEFAULT_STORE_PATH = os.path.join(PROCESSED_DATA_DIR, "solutions.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    n          INTEGER PRIMARY KEY,
+    side       REAL NOT NULL,
+    score      REAL NOT NULL,
+    state      BLOB NOT NULL,
+    source     TEXT,
+    updated_at REAL NOT NULL
+)
+"""
+
+class SolutionStore:
+    """
+    Penyimpanan solusi terbaik per puzzle (key: N) berbasis SQLite.
+
+    - Lookup per N O(1) lewat primary key; tidak perlu memuat semua solusi.
+    - put() hanya menyimpan layout yang valid (tanpa overlap, validasi ketat seperti
+      metrik kompetisi) dan hanya mengganti jika sisi barunya lebih kecil (best-so-far).
+    - Setiap tulis adalah satu transaksi atomik; WAL + busy timeout membuat
+      banyak worker aman menulis bersamaan tanpa saling menimpa.
+    - Database baru dibuat saat tulis pertama; pembaca (submit, convert, resume)
+      membuka read-only dan tidak meninggalkan file apa pun jika store belum ada.
+    """
+    def __init__(self, path=DEFAULT_STORE_PATH, timeout=60.0):
+        self.path = path
+        self.timeout = timeout
+        self._created = False
+
+    def _create(self):
+        """Buat folder, file database dan tabel (sekali, sebelum tulis pertama)."""
+        if self._created:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(_SCHEMA)
+        finally:
+            conn.close()
+        self._created = True
+
+    @contextmanager
+    def _connect(self):
+        # Satu koneksi tulis per operasi: commit/rollback otomatis, lalu ditutup
+        self._create()
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _query(self, sql, params=()):
+        """SELECT read-only; store yang belum pernah ditulisi dianggap kosong."""
+        if not os.path.exists(self.path):
+            return []
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=self.timeout)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def put(self, n, state, side=None, source=""):
+        """
+        Simpan layout (N, 3) / flat N*3 untuk puzzle n jika valid dan lebih baik
+        dari yang tersimpan. Return True jika layout baru disimpan.
+        """
+        state = np.asarray(state, dtype=np.float64).reshape(n, 3)
+        report = score_puzzles({n: state})[n]
+        if not report["valid"]:
+            # Layout overlap / keluar batas tidak boleh menggeser solusi valid
+            return False
+        if side is None:
+            side = report["side"]
+        with self._connect() as conn:
+            cur = conn.execute(
+                """
+                INSERT INTO solutions (n, side, score, state, source, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(n) DO UPDATE SET
+                    side = excluded.side,
+                    score = excluded.score,
+                    state = excluded.state,
+                    source = excluded.source,
+                    updated_at = excluded.updated_at
+                WHERE excluded.side < solutions.side
+                """,
+                (n, side, side ** 2 / n, state.tobytes(), source, time.time()),
+            )
+            return cur.rowcount > 0
+
+    def get(self, n):
+        """Solusi terbaik untuk puzzle n sebagai dict, atau None jika belum ada."""
+        rows = self._query(
+            "SELECT n, side, score, state, source, updated_at FROM solutions WHERE n = ?", (n,)
+        )
+        return self._to_dict(rows[0]) if rows else None
+
+    def has(self, n):
+        return bool(self._query("SELECT 1 FROM solutions WHERE n = ?", (n,)))
+
+    def completed(self):
+        """Himpunan N yang sudah punya solusi (untuk cek resume)."""
+        return {row[0] for row in self._query("SELECT n FROM solutions")}
+
+    def all(self):
+        """Semua solusi, urut berdasarkan N."""
+        rows = self._query("SELECT n, side, score, state, source, updated_at FROM solutions ORDER BY n")
+        return [self._to_dict(row) for row in rows]
+
+    def to_rows(self):
+        """Format lama: list dict {"id", "x", "y", "deg"} per pohon (untuk submit)."""
+        rows = []
+        for sol in self.all():
+            n = sol["n"]
+            for i, (x, y, deg) in enumerate(sol["state"]):
+                rows.append({"id": f"{n:03d}_{i}", "x": x, "y": y, "deg": deg})
+        return rows
+
+    def import_rows(self, rows, source="legacy"):
+        """
+        Migrasi dari format lama (list dict per pohon, mis. final_solutions_checkpoint.json).
+        Return jumlah puzzle yang tersimpan/membaik.
+        """
+        improved = 0
+        for n, state in puzzles_from_rows(rows).items():
+            improved += self.put(n, state, source=source)
+        return improved
+
+    def export_archive(self, path):
+        """Tulis semua solusi ke arsip biner (lihat archive.write_archive). Return jumlah puzzle."""
+        puzzles = {sol["n"]: sol["state"] for sol in self.all()}
+        write_archive(path, puzzles)
+        return len(puzzles)
+
+    @staticmethod
+    def _to_dict(row):
+        n, side, score, blob, source, updated_at = row
+        return {
+            "n": n,
+            "side": side,
+            "score": score,
+            "state": np.frombuffer(blob, dtype=np.float64).reshape(n, 3),
+            "source": source,
+            "updated_at": updated_at,
+        }
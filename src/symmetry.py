@@ -0,0 +1,97 @@
+import hashlib
+import numpy as np
+
+# Resolusi kuantisasi default (jumlah desimal) untuk x, y dan deg. Cukup halus
+# untuk key cache cost: penalti overlap x 1e6 sensitif terhadap geseran ~1e-8
+CANONICAL_DECIMALS = 10
+
+def _d4():
+    """
+    8 simetri D4: cermin x -> -x (opsional), lalu rotasi k*90 deg.
+    Return: matriks posisi (8, 2, 2) integer, tanda sudut (8,) dan offset sudut k*90 (8,).
+    Pohon simetris terhadap sumbu vertikalnya, jadi cermin memetakan deg -> -deg.
+    """
+    quarter = np.array([[0, -1], [1, 0]])
+    mats, signs, offsets = [], [], []
+    for mirror in (False, True):
+        flip = np.diag([-1, 1]) if mirror else np.eye(2, dtype=int)
+        for k in range(4):
+            mats.append(np.linalg.matrix_power(quarter, k) @ flip)
+            signs.append(-1 if mirror else 1)
+            offsets.append(90 * k)
+    return np.array(mats, dtype=np.int64), np.array(signs), np.array(offsets)
+
+D4_MATRICES, D4_SIGNS, D4_OFFSETS = _d4()
+
+def _apply_d4(pos, deg, period, v=slice(None)):
+    """
+    Varian D4 (default semua 8 sekaligus): pos (N, 2), deg (N,) -> (8, N, 3).
+    Koefisien matriks hanya 0/+-1, jadi hasilnya exact (juga untuk grid integer).
+    """
+    m, sign, offset = D4_MATRICES[v], D4_SIGNS[v], D4_OFFSETS[v] * period // 360
+    x, y = pos[:, 0], pos[:, 1]
+    out = np.empty(m.shape[:-2] + deg.shape + (3,), dtype=pos.dtype)
+    out[..., 0] = m[..., 0, 0, None] * x + m[..., 0, 1, None] * y
+    out[..., 1] = m[..., 1, 0, None] * x + m[..., 1, 1, None] * y
+    out[..., 2] = (sign[..., None] * deg + offset[..., None]) % period
+    return out
+
+def _quantize(s, decimals):
+    """Layout float (N, 3) -> grid integer (N, 3); sudut dibungkus modulo 360."""
+    scale = 10.0 ** decimals
+    q = np.rint(s * scale).astype(np.int64)
+    q[:, 2] %= int(round(360 * scale))
+    return q
+
+def canonical_form(state, n_trees, decimals=CANONICAL_DECIMALS):
+    """
+    Bentuk kanonik layout terhadap translasi, rotasi kelipatan 90 deg, cermin
+    dan permutasi pohon.
+
+    Layout digeser agar rata-rata posisi pohon di origin lalu dikuantisasi.
+    Kedelapan simetri D4 diterapkan langsung di grid integer, pohon di tiap
+    varian diurutkan leksikografis (x, y, deg), dan varian dengan bytes
+    terkecil dipilih (urutan total apa pun cukup, asalkan hanya bergantung
+    pada himpunan 8 varian).
+    Return: (state kanonik flat N*3 float, grid integer (N, 3)).
+    """
+    s = np.asarray(state, dtype=np.float64)[:n_trees * 3].reshape(n_trees, 3).copy()
+    s[:, :2] -= s[:, :2].mean(axis=0)
+    s[:, 2] %= 360.0
+    q = _quantize(s, decimals)
+    period = int(round(360 * 10.0 ** decimals))
+
+    variants = _apply_d4(q[:, :2], q[:, 2], period)
+    best, best_key = None, None
+    for v in range(8):
+        order = np.lexsort(variants[v].T[::-1])
+        key = variants[v, order].tobytes()
+        if best_key is None or key < best_key:
+            best, best_key = (v, order), key
+
+    v, order = best
+    t = _apply_d4(s[:, :2], s[:, 2], 360.0, v)[order]
+    return t.ravel(), variants[v, order]
+
+def canonical_key(state, n_trees, decimals=CANONICAL_DECIMALS):
+    """
+    Hash 16 byte dari bentuk kanonik terkuantisasi. Layout yang sama hingga
+    simetri (dan selisih < 10^-decimals) mendapat key yang sama.
+    """
+    _, q = canonical_form(state, n_trees, decimals)
+    return hashlib.blake2b(q.tobytes(), digest_size=16).digest()
+
+def dedupe_states(states, n_trees, decimals=6):
+    """
+    Buang layout duplikat (hingga simetri) dari list state, urutan dipertahankan.
+    decimals default 6 = presisi submission: titik awal multi-start yang jatuh
+    ke basin yang sama cukup dikerjakan sekali.
+    Return: list indeks state yang unik.
+    """
+    seen, keep = set(), []
+    for idx, state in enumerate(states):
+        key = canonical_key(state, n_trees, decimals)
+        if key not in seen:
+            seen.add(key)
+            keep.append(idx)
+    return keep
@@ -13,8 +13,11 @@ def save_to_processed(data, filename):
         if isinstance(o, np.ndarray): return o.tolist()
         raise TypeError
         
-    with open(path, 'w') as f:
+    # Tulis ke file sementara lalu os.replace: file lama tidak pernah setengah tertulis
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
         json.dump(data, f, default=convert, indent=4)
+    os.replace(tmp_path, path)
     print(f"Data tersimpan di {path}")
 
 def load_from_processed(filename):
@@ -0,0 +1,168 @@
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+from .optimizer import evaluate_batch
+from .penetration import batch_overlap_penalty
+from .geometry import layout_side
+from .reward import RewardShaper, StepGeometry
+from . import instrument
+
+class ChristmasTreeVecEnv(VecEnv):
+    """
+    Versi vectorized native dari ChristmasTreeEnv untuk stable-baselines3.
+
+    Semua state disimpan dalam satu array (E, N*3); aksi, clipping, bounding
+    square dan penalti overlap dihitung untuk E env sekaligus dalam satu proses,
+    tanpa pickling/IPC seperti SubprocVecEnv.
+
+    overlap_mode:
+      "area"  -> luas irisan (sama dengan reward ChristmasTreeEnv), satu panggilan Shapely
+      "depth" -> kedalaman penetrasi SAT^2, murni operasi array NumPy
+
+    initial_state / init_noise sama seperti di ChristmasTreeEnv; bisa juga diganti
+    lewat set_options({"initial_state": ..., "init_noise": ...}) sebelum reset().
+    reward_terms sama seperti di ChristmasTreeEnv; term delta disimpan per env.
+    """
+    def __init__(self, n_envs=8, n_trees=5, overlap_mode="area", max_episode_steps=None,
+                 initial_state=None, init_noise=0.0, reward_terms=None):
+        self.n_trees = n_trees
+        self.initial_state = initial_state
+        self.init_noise = init_noise
+        self.limit = 20.0
+        self.rot_limit = 360.0  # Rotasi di-clip, tidak dibungkus (lihat ChristmasTreeEnv)
+        self.move_scale = 0.2   # Maks geser 0.2 unit
+        self.rot_scale = 5.0    # Maks putar 5 derajat
+        self.penalty_weight = 10000.0
+        self.reward = RewardShaper(
+            {"area": 1.0, "overlap": self.penalty_weight} if reward_terms is None else reward_terms
+        )
+        self.overlap_mode = overlap_mode
+        self.max_episode_steps = max_episode_steps
+        self.render_mode = None
+
+        action_space = spaces.Box(low=-1, high=1, shape=(n_trees * 3,), dtype=np.float32)
+        # x, y dalam +-limit, rotasi dalam +-rot_limit
+        observation_space = spaces.Box(
+            low=np.tile(np.array([-self.limit, -self.limit, -self.rot_limit], dtype=np.float32), n_trees),
+            high=np.tile(np.array([self.limit, self.limit, self.rot_limit], dtype=np.float32), n_trees),
+            dtype=np.float32,
+        )
+
+        self.scale_vec = np.tile(
+            np.array([self.move_scale, self.move_scale, self.rot_scale], dtype=np.float32), n_trees
+        )
+        self.states = np.zeros((n_envs, n_trees * 3), dtype=np.float32)
+        self._xy = self.states.reshape(n_envs, n_trees, 3)[..., :2]   # View posisi
+        self._deg = self.states.reshape(n_envs, n_trees, 3)[..., 2]   # View rotasi
+        self.episode_steps = np.zeros(n_envs, dtype=np.int64)
+        self._actions = None
+        self._rng = np.random.default_rng()
+        # Geometri batch (side/overlap lazy) dipakai bersama semua term reward
+        self._geom = StepGeometry(self._xy, lambda: layout_side(self.states), self._overlap)
+
+        super().__init__(n_envs, observation_space, action_space)
+
+    def _random_states(self, count):
+        if self.initial_state is None:
+            # Inisialisasi posisi acak tapi rapat di tengah
+            return self._rng.uniform(-2, 2, size=(count, self.n_trees * 3)).astype(np.float32)
+        # Warm start dari seed (lattice / solusi N-1, N+1)
+        states = np.tile(np.asarray(self.initial_state, dtype=np.float32), (count, 1))
+        if self.init_noise:
+            states += self._rng.normal(0, self.init_noise, size=states.shape) * self.scale_vec
+        # Orientasi seed dinormalkan ke [-90, 270) (lihat ChristmasTreeEnv.reset)
+        deg = states.reshape(count, self.n_trees, 3)[..., 2]
+        deg += 90.0
+        np.mod(deg, 360.0, out=deg)
+        deg -= 90.0
+        return states
+
+    def reset(self):
+        if self._seeds[0] is not None:
+            self._rng = np.random.default_rng(self._seeds[0])
+        # Opsi reset berlaku untuk semua env (state disimpan bersama)
+        for options in self._options:
+            if options:
+                self.initial_state = options.get("initial_state", self.initial_state)
+                self.init_noise = options.get("init_noise", self.init_noise)
+        self.states[:] = self._random_states(self.num_envs)
+        self._bound_states()
+        self.episode_steps[:] = 0
+        self.reward.reset()
+        self._reset_seeds()
+        self._reset_options()
+        return self.states.copy()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions, dtype=np.float32).reshape(self.num_envs, -1)
+
+    def step_wait(self):
+        # Terapkan aksi untuk semua env, lalu clip posisi & rotasi (in place)
+        self.states += self._actions * self.scale_vec
+        self._bound_states()
+        self.episode_steps += 1
+        instrument.count("env.steps", self.num_envs)
+
+        # Geometri batch dihitung lazy & sekali saja, dipakai bersama semua term reward
+        geom = self._geom
+        geom.clear()
+        rewards = np.asarray(self.reward(geom), dtype=np.float32)
+        side, overlap = geom.side, geom.overlap
+        area_score = side ** 2
+
+        obs = self.states.copy()
+        infos = [
+            {"side": float(side[k]), "score": float(area_score[k]), "overlap": float(overlap[k])}
+            for k in range(self.num_envs)
+        ]
+
+        dones = np.zeros(self.num_envs, dtype=bool)
+        if self.max_episode_steps is not None:
+            dones = self.episode_steps >= self.max_episode_steps
+            done_idx = np.flatnonzero(dones)
+            for k in done_idx:
+                infos[k]["terminal_observation"] = obs[k].copy()
+                infos[k]["TimeLimit.truncated"] = True
+            if len(done_idx):
+                # Auto-reset seperti VecEnv lain di SB3
+                self.states[done_idx] = self._random_states(len(done_idx))
+                self._bound_states()
+                self.episode_steps[done_idx] = 0
+                self.reward.reset(done_idx)
+                obs[done_idx] = self.states[done_idx]
+
+        return obs, rewards, dones, infos
+
+    def _bound_states(self):
+        """Clip x, y ke +-limit dan rotasi ke +-rot_limit, in place untuk semua env."""
+        np.clip(self._xy, -self.limit, self.limit, out=self._xy)
+        np.clip(self._deg, -self.rot_limit, self.rot_limit, out=self._deg)
+
+    def _overlap(self):
+        if self.overlap_mode == "depth":
+            return batch_overlap_penalty(self.states)
+        return evaluate_batch(self.states, penalty_weight=self.penalty_weight)[1]
+
+    def close(self):
+        pass
+
+    def _indices(self, indices):
+        if indices is None:
+            return range(self.num_envs)
+        if isinstance(indices, int):
+            return [indices]
+        return indices
+
+    def get_attr(self, attr_name, indices=None):
+        # Semua env berbagi satu objek, sehingga atributnya sama untuk setiap indeks
+        return [getattr(self, attr_name) for _ in self._indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._indices(indices)]
@@ -1,80 +1,81 @@
-import pandas as pd
-import numpy as np
+import os
+import sys
 from src.utils import load_from_processed
-from src.geometry import get_tree_polygon
-from shapely import affinity
+from src.store import SolutionStore
+from src.config import ARCHIVE_PATH
+from src.scoring import read_submission, score_puzzles, total_score
+from src.archive import write_archive, export_csv, puzzles_from_rows
 
-def validate_overlaps(df):
-    """Validasi akhir sebelum submit."""
+SAMPLE_PATH = "data/raw/sample_submission.csv"
+OUTPUT_PATH = "submission.csv"
+SUBMISSION_DECIMALS = 6
+
+def validate_overlaps(puzzles):
+    """
+    Validasi akhir sebelum submit untuk {n: state (n, 3)}.
+    Semua puzzle dinilai sekaligus in-process oleh score_puzzles (validasi ketat
+    kompetisi, tervektorisasi); mencetak overlap, sisi per puzzle dan skor total
+    kompetisi (jumlah side^2 / N). Return list N yang tidak valid (kosong = valid).
+    """
     print("Memvalidasi Overlap...")
-    base_tree = get_tree_polygon()
-    
-    # Group by puzzle ID (001, 002...)
-    df['puzzle_id'] = df['id'].apply(lambda x: x.split('_')[0])
-    valid = True
-    
-    for pid in df['puzzle_id'].unique():
-        subset = df[df['puzzle_id'] == pid]
-        polys = []
-        for _, row in subset.iterrows():
-            # Remove 's'
-            x = float(row['x'].replace('s',''))
-            y = float(row['y'].replace('s',''))
-            d = float(row['deg'].replace('s',''))
-            p = affinity.rotate(base_tree, d, origin=(0,0))
-            p = affinity.translate(p, x, y)
-            polys.append(p)
-            
-        for i in range(len(polys)):
-            for j in range(i+1, len(polys)):
-                if polys[i].intersects(polys[j]):
-                    area = polys[i].intersection(polys[j]).area
-                    if area > 1e-5: # Toleransi kecil
-                        print(f"Overlap di Puzzle {pid} (Area: {area:.6f})")
-                        valid = False
-    return valid
+    report = score_puzzles(puzzles)
+
+    invalid = []
+    for n, p in report.items():
+        if p["out_of_bounds"]:
+            print(f"Puzzle {n:03d}: koordinat di luar batas")
+        for i, j in p["overlaps"]:
+            print(f"Overlap di Puzzle {n:03d} (pohon {i} dan {j})")
+        if not p["valid"]:
+            invalid.append(n)
+
+    print("Puzzle | Side       | Skor (side^2/N)")
+    for n, p in report.items():
+        print(f"{n:6d} | {p['side']:10.6f} | {p['score']:.6f}")
+    print(f"Total skor kompetisi: {total_score(report):.6f}")
+    return sorted(invalid)
 
 def main():
-    # 1. Load Solusi Kita
-    my_solutions = load_from_processed("final_solutions_checkpoint.json")
-    if not my_solutions:
+    # 1. Load Solusi Kita (solution store; fallback ke checkpoint JSON lama)
+    solutions = {sol["n"]: sol["state"] for sol in SolutionStore().all()}
+    if not solutions:
+        solutions = puzzles_from_rows(load_from_processed("final_solutions_checkpoint.json") or [])
+    if not solutions:
         print(" Tidak ada data solusi ditemukan di data/processed!")
-        return
+        return 1
+
+    print(f"Memuat {sum(solutions)} posisi pohon ({len(solutions)} puzzle) dari hasil training...")
 
-    print(f"Memuat {len(my_solutions)} posisi pohon dari hasil training...")
-    my_df = pd.DataFrame(my_solutions)
-    
     # Load Template Kaggle
     # Pastikan Anda sudah menaruh sample_submission.csv di data/raw/
     try:
-        sample_df = pd.read_csv("data/raw/sample_submission.csv")
+        puzzles = read_submission(SAMPLE_PATH)
     except FileNotFoundError:
-        print("File data/raw/sample_submission.csv tidak ditemukan!")
-        return
+        print(f"File {SAMPLE_PATH} tidak ditemukan!")
+        return 1
+    template = dict(puzzles)
+
+    # Update hanya puzzle yang kita punya solusinya
+    puzzles.update(solutions)
+
+    # Formatting 's' (Wajib Kaggle), lalu validasi persis apa yang tertulis di CSV.
+    # Puzzle yang overlap (mis. karena pembulatan) diganti layout template, lalu dicek ulang
+    for attempt in range(2):
+        print("Memformat angka dengan prefix 's'...")
+        export_csv(OUTPUT_PATH, puzzles, decimals=SUBMISSION_DECIMALS)
+        invalid = validate_overlaps(read_submission(OUTPUT_PATH))
+        if not invalid:
+            # Arsip biner presisi penuh semua layout (bisa di-memmap, lihat src/archive.py)
+            write_archive(ARCHIVE_PATH, puzzles)
+            print(f"File siap: {OUTPUT_PATH}")
+            return 0
+        if attempt == 0:
+            print(f"Fallback ke layout template untuk puzzle: {invalid}")
+            puzzles.update({n: template[n] for n in invalid})
 
-    # Gabungkan (Update)
-    # Set index ke ID untuk memudahkan update
-    sample_df.set_index('id', inplace=True)
-    my_df.set_index('id', inplace=True)
-    
-    # Update hanya baris yang kita punya solusinya
-    sample_df.update(my_df)
-    sample_df.reset_index(inplace=True)
-    
-    # Formatting 's' (Wajib Kaggle)
-    print("Memformat angka dengan prefix 's'...")
-    final_csv = sample_df.copy()
-    cols = ['x', 'y', 'deg']
-    
-    for col in cols:
-        # Bersihkan 's' lama jika ada, convert float, format string, tambah 's' baru
-        final_csv[col] = final_csv[col].astype(str).str.replace('s', '').astype(float)
-        final_csv[col] = final_csv[col].apply(lambda x: f"s{x:.6f}")
-    
-    # Simpan
-    output_file = "submission.csv"
-    final_csv.to_csv(output_file, index=False)
-    print(f"File siap: {output_file}")
+    os.remove(OUTPUT_PATH)
+    print(f"GAGAL: puzzle {invalid} tetap overlap, {OUTPUT_PATH} tidak dibuat.")
+    return 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file